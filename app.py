@@ -1,15 +1,64 @@
 from flask import Flask, request, jsonify, send_from_directory
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 import pandas as pd
+import numpy as np
+import orjson
 import os
+import hashlib
+import io
+import functools
+import contextlib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.http import http_date
 from werkzeug.utils import secure_filename
 import datetime
-
-# Import your biometric processing function
-# Ensure 'biometric_processor.py' is in the same directory as 'app.py'
-from biometric_processor import process_biometric_data_for_excel_dashboard
+import decimal
+
+def orjson_default(o):
+    """Encode the types orjson leaves to `default` the way Flask's default provider does."""
+    if isinstance(o, datetime.date): # Also datetime; sent here by OPT_PASSTHROUGH_DATETIME
+        return http_date(o)
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+class OrjsonProvider(JSONProvider):
+    """Make jsonify() and app.json use orjson, the encoder behind the cached API bodies.
+
+    Output matches Flask's DefaultJSONProvider: keys are sorted and dates are
+    HTTP dates. Only the dumps() options orjson can honour are accepted.
+    """
+
+    sort_keys = True
+    default = staticmethod(orjson_default)
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.pop('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        indent = kwargs.pop('indent', None)
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        elif indent is not None:
+            raise TypeError(f"orjson only supports indent=2, not indent={indent!r}")
+        default = kwargs.pop('default', self.default)
+        if kwargs:
+            raise TypeError(f"Unsupported orjson dumps() options: {', '.join(sorted(kwargs))}")
+        return orjson.dumps(obj, default=default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            raise TypeError(f"Unsupported orjson loads() options: {', '.join(sorted(kwargs))}")
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # --- New Additions for File Upload ---
 UPLOAD_FOLDER = 'uploads' # Define the folder to save uploads
@@ -21,6 +70,32 @@ if not os.path.exists(UPLOAD_FOLDER):
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 # --- End of New Additions for File Upload ---
 
+# Set LOAD_VERBOSE=1 to dump DataFrame previews while loading a dashboard
+LOAD_VERBOSE = bool(os.getenv("LOAD_VERBOSE"))
+
+# Arrow-backed strings keep ID/name columns in one packed UTF-8 buffer
+try:
+    import pyarrow # noqa: F401
+    TEXT_DTYPE = 'string[pyarrow]'
+except ImportError:
+    TEXT_DTYPE = 'string'
+
+# Columns of the Main_Data sheet written by biometric_processor.py, in sheet order
+DASHBOARD_COLUMNS = ['Employee_ID', 'Employee_Name', 'Date', 'Check_In', 'Check_Out',
+                     'Working_Hours', 'Late_Minutes', 'Status', 'Late_Flag', 'Is_Late']
+
+# In-memory dtypes of the dashboard columns; low-cardinality columns are
+# categorical so each cell is an int code instead of its own object
+COLUMN_DTYPES = {
+    'Employee_ID': TEXT_DTYPE,
+    'Employee_Name': TEXT_DTYPE,
+    'Check_In': TEXT_DTYPE,
+    'Check_Out': TEXT_DTYPE,
+    'Status': 'category',
+    'Late_Flag': 'category',
+    'Is_Late': 'category',
+}
+
 
 CORS(app, resources={
     r"/api/*": {
@@ -39,7 +114,7 @@ CORS(app, resources={
 })
 
 # --- Helper function to find the latest processed Excel dashboard ---
-def get_latest_processed_excel_path():
+def find_latest_processed_excel_path():
     """Finds the most recently created interactive Excel dashboard."""
     files = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) if f.startswith('interactive_attendance_charts_') and f.endswith('.xlsx')]
     if not files:
@@ -49,121 +124,356 @@ def get_latest_processed_excel_path():
     files.sort(key=lambda x: os.path.getmtime(os.path.join(app.config['UPLOAD_FOLDER'], x)), reverse=True)
     return os.path.join(app.config['UPLOAD_FOLDER'], files[0])
 
-# --- Function to load biometric data from the latest processed Excel file ---
-def load_biometric_data_from_latest_excel():
-    """Load biometric data from the 'Main_Data' sheet of the latest processed Excel file."""
-    file_path = get_latest_processed_excel_path()
-    
+# Path found by the last uploads/ scan, keyed on the folder's own mtime. Adding,
+# removing or renaming a file there changes it, so every worker notices a new
+# upload with a single stat() instead of listing and stat()ing every file.
+_latest_dashboard = {'folder_mtime': None, 'path': None}
+_latest_dashboard_lock = threading.Lock()
+
+def get_latest_dashboard_version():
+    """(path, mtime) of the latest dashboard, or None if nothing has been processed yet."""
+    folder_mtime = os.stat(app.config['UPLOAD_FOLDER']).st_mtime_ns
+    with _latest_dashboard_lock:
+        if _latest_dashboard['folder_mtime'] != folder_mtime:
+            _latest_dashboard['path'] = find_latest_processed_excel_path()
+            _latest_dashboard['folder_mtime'] = folder_mtime
+        latest_excel = _latest_dashboard['path']
+    if latest_excel is None:
+        return None
+    # The file itself is stat()ed on every call: a scan made while it was
+    # still being written must not pin that partial version
+    try:
+        return (latest_excel, os.path.getmtime(latest_excel))
+    except FileNotFoundError:
+        return None # Removed since the scan; the folder mtime changed, so the next call rescans
+
+def get_latest_processed_excel_path():
+    """Path of the latest dashboard, or None if nothing has been processed yet."""
+    version = get_latest_dashboard_version()
+    return version[0] if version else None
+
+# --- Parquet sidecar of each parsed dashboard, so API loads skip the Excel parse ---
+PARQUET_CACHE_VERSION = 5 # Bump when the cached frame's columns or dtypes change
+
+def get_parquet_sidecar_path(file_path):
+    """Parquet file stored next to a dashboard, e.g. 'dashboard.v5.parquet' for 'dashboard.xlsx'."""
+    return f"{os.path.splitext(file_path)[0]}.v{PARQUET_CACHE_VERSION}.parquet"
+
+def read_parquet_sidecar(file_path):
+    """Return the dashboard's cached frame, or None if the sidecar is missing or stale."""
+    sidecar_path = get_parquet_sidecar_path(file_path)
+    try:
+        if os.path.getmtime(sidecar_path) < os.path.getmtime(file_path):
+            return None # The dashboard was rewritten after the sidecar was made
+        # Parquet does not round-trip every dtype (string storage, bool categories)
+        return pd.read_parquet(sidecar_path).astype(COLUMN_DTYPES)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Ignoring unreadable Parquet sidecar '{sidecar_path}': {e}")
+        return None
+
+def write_parquet_sidecar(df, file_path):
+    """Best-effort write of the parsed DataFrame; failures only cost a re-parse."""
+    sidecar_path = get_parquet_sidecar_path(file_path)
+    try:
+        # Write to a temporary name first so other workers never read a partial file
+        tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, compression='zstd')
+        os.replace(tmp_path, sidecar_path)
+    except Exception as e:
+        print(f"Could not write Parquet sidecar '{sidecar_path}': {e}")
+
+# Text columns of the Main_Data sheet, read straight into TEXT_DTYPE
+# (Is_Late is written as a plain bool, so it is left to the reader)
+READ_TEXT_COLUMNS = [col for col in COLUMN_DTYPES if col != 'Is_Late']
+
+# --- Fallback reader used when the Calamine engine is unavailable ---
+def read_main_data_with_openpyxl(file_path):
+    """Read the 'Main_Data' sheet with openpyxl in read-only mode.
+
+    Streams plain cell values instead of building the full workbook in memory.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        # Row 1 is the title, row 2 is blank, headers are on row 3
+        rows = wb['Main_Data'].iter_rows(min_row=3, max_col=10, values_only=True)
+        headers = next(rows, ())
+        df = pd.DataFrame(list(rows), columns=headers)
+    finally:
+        wb.close()
+    # Match read_excel: skip fully blank rows and treat 'N/A' cells as missing
+    return df.dropna(how='all').replace('N/A', None)
+
+# --- Function to load biometric data from a processed Excel file ---
+def load_biometric_data_from_excel(file_path):
+    """Load biometric data from the 'Main_Data' sheet of a processed Excel file."""
     if file_path is None:
         print(f"Warning: No processed Excel dashboard found in {app.config['UPLOAD_FOLDER']}. Returning empty DataFrame.")
-        expected_columns = [
-            'Employee_ID', 'Employee_Name', 'Date', 'Check_In', 'Check_Out',
-            'Working_Hours', 'Late_Minutes', 'Status', 'Late_Flag', 'Is_Late'
-        ]
-        
-        # Apply expected columns, truncating or padding as needed
-        df.columns = expected_columns[:len(df.columns)]
-        if len(df.columns) < len(expected_columns):
-            # Pad with 'Extra_X' if fewer columns than expected
-            df.columns = list(df.columns) + [f'Extra_{i}' for i in range(len(df.columns), len(expected_columns))]
-        elif len(df.columns) > len(expected_columns):
-            # Truncate if more columns than expected
-            df = df.iloc[:, :len(expected_columns)]
-            df.columns = expected_columns
+        return pd.DataFrame(columns=DASHBOARD_COLUMNS)
+
+    df = read_parquet_sidecar(file_path)
+    if df is not None:
+        return df
 
     print("Attempting to load biometric data from latest Excel:", file_path)
     try:
         # Load the 'Main_Data' sheet, headers are at row 3 (index 2)
-        df = pd.read_excel(file_path, sheet_name='Main_Data', header=2) 
-        
-        # Define expected headers from your biometric_processor.py output
-        expected_headers = ['Employee_ID', 'Employee_Name', 'Date', 'Check_In', 'Check_Out',
-                            'Working_Hours', 'Late_Minutes', 'Status', 'Late_Flag', 'Is_Late']
+        try:
+            # Calamine (Rust) parses .xlsx natively, much faster than openpyxl
+            # Only read the ten dashboard columns, and declare the text ones up
+            # front so they are never inferred as object columns first
+            df = pd.read_excel(file_path, sheet_name='Main_Data', header=2, engine='calamine',
+                               usecols='A:J', dtype={col: TEXT_DTYPE for col in READ_TEXT_COLUMNS})
+        except ImportError:
+            # python-calamine not installed, stream the sheet with openpyxl instead
+            df = read_main_data_with_openpyxl(file_path)
         
         # Rename columns to match expected headers if there's a mismatch
-        if len(df.columns) >= len(expected_headers):
-            df.columns = expected_headers[:len(df.columns)]
+        if len(df.columns) >= len(DASHBOARD_COLUMNS):
+            df.columns = DASHBOARD_COLUMNS[:len(df.columns)]
         else: # Handle cases where fewer columns are loaded than expected
             current_cols = list(df.columns)
-            new_cols = current_cols + [h for h in expected_headers if h not in current_cols]
+            new_cols = current_cols + [h for h in DASHBOARD_COLUMNS if h not in current_cols]
             df = df.reindex(columns=new_cols, fill_value='N/A')
-            df.columns = expected_headers # Ensure final columns are exactly as expected
+            df.columns = DASHBOARD_COLUMNS # Ensure final columns are exactly as expected
 
-        print("Loaded Processed Data (first 5 rows):")
-        print(df.head().to_string())
-        print("Columns after loading processed Excel sheet:", df.columns.tolist())
+        if LOAD_VERBOSE:
+            print("Loaded Processed Data (first 5 rows):")
+            print(df.head().to_string())
+            print("Columns after loading processed Excel sheet:", df.columns.tolist())
         
-        # Ensure correct types and handle potential NaNs as before
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df['Date'] = df['Date'].dt.strftime('%Y-%m-%d').fillna('N/A')
-        df['Employee_ID'] = df['Employee_ID'].astype(str).str.strip()
-        df = df.fillna('N/A').infer_objects(copy=False)
+        # Date becomes day-resolution datetime64 (NaT when missing); only the
+        # text/category columns get the 'N/A' placeholder
+        df = df.assign(
+            Date=pd.to_datetime(df['Date'], format='ISO8601', errors='coerce', cache=True).values.astype('datetime64[D]'),
+            Employee_ID=df['Employee_ID'].astype(TEXT_DTYPE).str.strip(),
+        ).fillna({col: 'N/A' for col in COLUMN_DTYPES}).astype(COLUMN_DTYPES)
+        # Store rows in Date order so the sidecar is already sorted for BioStore
+        df = df.sort_values('Date', kind='stable', ignore_index=True)
         
-        print("Final Processed Data for API (first 5 rows):")
-        print(df.head().to_string())
+        if LOAD_VERBOSE:
+            print("Final Processed Data for API (first 5 rows):")
+            print(df.head().to_string())
+        write_parquet_sidecar(df, file_path)
         return df
         
     except Exception as e:
         print(f"Error loading processed Excel file '{file_path}': {e}")
         import traceback
         traceback.print_exc()
-        expected_columns = [
-            'Employee_ID', 'Employee_Name', 'Date', 'Check_In', 'Check_Out',
-            'Working_Hours', 'Late_Minutes', 'Status', 'Late_Flag', 'Is_Late'
-        ]
-        return pd.DataFrame(columns=expected_columns)
+        return pd.DataFrame(columns=DASHBOARD_COLUMNS)
+
+
+# --- In-memory search data, rebuilt only when a new dashboard is uploaded ---
+class BioStore:
+    """Read-only search data for one dashboard version, shared by every request.
+
+    Holds the frame sorted by Date, its Date array, and an index mapping
+    lowercase Employee_ID -> ascending row positions. The NumPy arrays are
+    marked read-only so that, with `gunicorn --preload`, forked workers keep
+    sharing the same copy-on-write pages.
+    """
+
+    def __init__(self, version, df):
+        self.version = version
+        # Rows must be in Date order so date range filters become binary
+        # searches (rows without a date sort last as NaT). Frames from the
+        # loader already are, so only sort when the order is off.
+        if not df['Date'].is_monotonic_increasing:
+            df = df.sort_values('Date', kind='stable', ignore_index=True)
+        self.df = df.reset_index(drop=True)
+        self.dates = self.df['Date'].to_numpy()
+        # Rows [0, dated_rows) have a date; computed once instead of per search
+        self.dated_rows = int(self.df['Date'].notna().sum())
+        # Lowercase once here so a search is a dict lookup, not a column scan
+        self.employee_index = self.df.groupby(self.df['Employee_ID'].str.lower(), sort=False).indices
+        for arr in (self.dates, *self.employee_index.values()):
+            arr.setflags(write=False)
+        # /api/health and /api/employees only depend on the dashboard, so
+        # encode them once here
+        latest_excel = version[0] if version else None
+        self.health_body = orjson.dumps(build_health_payload(latest_excel, self.df))
+        self.employees_body = orjson.dumps(build_employees_payload(self.df))
+
+# Row positions returned for an Employee_ID that is not in the index
+NO_ROWS = np.empty(0, dtype=np.intp)
+NO_ROWS.setflags(write=False)
+
+@functools.lru_cache(maxsize=1)
+def load_bio_store(file_path, mtime):
+    """Load and index one dashboard file, memoized on (path, mtime).
+
+    A new upload has a new path and mtime, so it misses the cache and evicts
+    the previous dashboard; only the latest one is ever served.
+    """
+    version = (file_path, mtime) if file_path else None
+    return BioStore(version, load_biometric_data_from_excel(file_path))
+
+def get_bio_store():
+    """Return the BioStore for the latest dashboard, loading it when a newer one appears."""
+    store = load_bio_store(*(get_latest_dashboard_version() or (None, None)))
+    if app.extensions.get('bio') is not store:
+        app.extensions['bio'] = store
+        # Cached search bodies belong to the old store; drop them so it can be freed
+        search_response_body.cache_clear()
+    return store
+
+
+def format_dates(values):
+    """Format a datetime64 array as YYYY-MM-DD strings, with 'N/A' for NaT."""
+    formatted = np.datetime_as_string(values, unit='D').astype(object)
+    formatted[np.isnat(values)] = 'N/A'
+    return formatted
+
+
+# --- Conditional GET: responses only change with the dashboard and the query args ---
+def dashboard_etag(version, *parts):
+    """ETag for a response built from one dashboard version and the given request parts."""
+    return hashlib.blake2b(repr((version, parts)).encode(), digest_size=16).hexdigest()
+
+def with_etag(response, etag):
+    """Attach the ETag; no-cache makes clients revalidate, which is a bodyless 304 until the next upload."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def not_modified(etag):
+    """Empty 304 response for a client that already holds `etag`."""
+    return with_etag(app.response_class(status=304), etag)
+
+
+# --- Pre-serialized response bodies ---
+# The home body never changes; the health and employees bodies only change
+# when a new dashboard is uploaded, so they are built along with each BioStore.
+HOME_RESPONSE_BODY = app.json.dumps({
+    'message': 'Welcome to the Biometric Search API',
+    'endpoints': {
+        '/api/employees': 'GET - Get all employees from latest processed data',
+        '/api/search': 'GET - Search records from latest processed data with query parameters',
+        '/api/upload': 'POST - Upload and process biometric raw files to generate new Excel dashboard',
+        '/api/job/<job_id>': 'GET - Status of an upload sent with the Prefer: respond-async header',
+        '/api/download-latest-dashboard': 'GET - Download the latest generated interactive Excel dashboard'
+    },
+    'status': 'active'
+})
+
+def store_json_response(store, name, body):
+    """Return a prebuilt JSON body of `store`, or a 304 if the client already has it."""
+    etag = dashboard_etag(store.version, name)
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+    return with_etag(app.response_class(body, mimetype='application/json'), etag)
 
 
 @app.route('/')
 def home():
     """Home route with API information"""
-    return jsonify({
-        'message': 'Welcome to the Biometric Search API',
-        'endpoints': {
-            '/api/employees': 'GET - Get all employees from latest processed data',
-            '/api/search': 'GET - Search records from latest processed data with query parameters',
-            '/api/upload': 'POST - Upload and process biometric raw files to generate new Excel dashboard',
-            '/api/download-latest-dashboard': 'GET - Download the latest generated interactive Excel dashboard'
-        },
-        'status': 'active'
-    })
+    return app.response_class(HOME_RESPONSE_BODY, mimetype='application/json')
 
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    """Health check endpoint"""
-    current_df = load_biometric_data_from_latest_excel() # Load data for health check
-    latest_excel = get_latest_processed_excel_path()
-    return jsonify({
+def build_health_payload(latest_excel, current_df):
+    """Health payload for a loaded dashboard file and its frame."""
+    return {
         'status': 'healthy',
         'data_loaded_from_latest_excel': not current_df.empty,
         'total_records_in_latest_excel': len(current_df) if not current_df.empty else 0,
         'latest_excel_dashboard': os.path.basename(latest_excel) if latest_excel else 'None found'
-    })
+    }
+
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    """Health check endpoint"""
+    store = get_bio_store()
+    return store_json_response(store, 'health', store.health_body)
+
+def build_employees_payload(current_df):
+    """Unique employees payload for a loaded dashboard frame."""
+    if current_df.empty:
+        print("No data available in DataFrame for employees.")
+        return {'employees': [], 'message': 'No processed data available. Please upload and process new files.'}
+
+    employees = current_df[['Employee_ID', 'Employee_Name']].drop_duplicates().to_dict(orient='records')
+    print(f"Found {len(employees)} unique employees in latest data.")
+    return {'employees': employees}
 
 @app.route('/api/employees', methods=['GET'])
 def get_employees():
     """Get all unique employees from the latest processed data."""
-    print("GET /api/employees endpoint hit")
-    current_df = load_biometric_data_from_latest_excel() # Load data dynamically
-    if current_df.empty:
-        print("No data available in DataFrame for employees.")
-        return jsonify({'employees': [], 'message': 'No processed data available. Please upload and process new files.'}), 200
-    
+    app.logger.debug("GET /api/employees endpoint hit")
     try:
-        employees = current_df[['Employee_ID', 'Employee_Name']].drop_duplicates().to_dict(orient='records')
-        print(f"Returning {len(employees)} unique employees from latest data.")
-        return jsonify({'employees': employees})
+        store = get_bio_store()
+        return store_json_response(store, 'employees', store.employees_body)
     except Exception as e:
         print(f"Error getting employees: {e}")
         return jsonify({'error': 'Failed to retrieve employees', 'message': str(e)}), 500
 
+@functools.lru_cache(maxsize=512)
+def search_response_body(store, employee_id, from_date, to_date):
+    """Run a search against `store` and return the orjson-encoded response body.
+
+    A store never changes once built, so repeated queries are answered from
+    this cache without touching the DataFrame. Raises ValueError for dates
+    that are not YYYY-MM-DD.
+    """
+    dates, employee_index = store.dates, store.employee_index
+    from_day = np.datetime64(from_date, 'D') if from_date else None
+    to_day = np.datetime64(to_date, 'D') if to_date else None
+    
+    # Rows are sorted by Date, so the date range is the slice [lo, hi).
+    # Undated (NaT) rows sit at the end and are excluded by any date filter.
+    lo = np.searchsorted(dates, from_day, side='left') if from_day is not None else 0
+    if to_day is not None:
+        hi = np.searchsorted(dates, to_day, side='right')
+    elif from_day is not None:
+        hi = store.dated_rows
+    else:
+        hi = len(dates)
+    
+    # Filter by employee ID if provided; its row positions are ascending,
+    # so the date range can be cut out of them with two more binary searches
+    if employee_id:
+        rows = employee_index.get(employee_id.lower(), NO_ROWS)
+        result = store.df.iloc[rows[np.searchsorted(rows, lo):np.searchsorted(rows, hi)]]
+    else:
+        result = store.df.iloc[lo:hi]
+    
+    # Check if any records found
+    if result.empty:
+        app.logger.debug("No records found for Employee_ID: '%s', From_Date: '%s', To_Date: '%s'", employee_id, from_date, to_date)
+        return orjson.dumps({
+            'records': [],
+            'message': f"No records found for Employee_ID: {employee_id}, From_Date: {from_date}, To_Date: {to_date}"
+        })
+    
+    # Return filtered results
+    # Ensure only columns that exist in the dataframe are selected
+    actual_display_columns = [col for col in DASHBOARD_COLUMNS if col in result.columns]
+    
+    # Build the rows column-wise: one array per column, zipped into dicts
+    # that all share the same key tuple, instead of DataFrame.to_dict()
+    columns = []
+    for col in actual_display_columns:
+        values = result[col].to_numpy()
+        if col == 'Date':
+            # Format dates as YYYY-MM-DD for the selected rows only
+            values = format_dates(values)
+        columns.append(values.tolist())
+    records = [dict(zip(actual_display_columns, row)) for row in zip(*columns)]
+    
+    return orjson.dumps({
+        'records': records,
+        'total_records': len(result)
+    }, option=orjson.OPT_SERIALIZE_NUMPY)
+
 @app.route('/api/search', methods=['GET'])
 def search_records():
     """Search records based on employee ID and date range from the latest processed data."""
-    print("GET /api/search endpoint hit")
-    current_df = load_biometric_data_from_latest_excel() # Load data dynamically
-    if current_df.empty:
-        print("No data available in DataFrame for search.")
+    app.logger.debug("GET /api/search endpoint hit")
+    store = get_bio_store()
+    if store.df.empty:
+        app.logger.debug("No data available in DataFrame for search.")
         return jsonify({
             'records': [],
             'message': 'No processed data available. Please upload and process new files before searching.'
@@ -175,42 +485,18 @@ def search_records():
         from_date = request.args.get('from_date', '').strip()
         to_date = request.args.get('to_date', '').strip()
         
-        print(f"Search query: Employee_ID='{employee_id}', From_Date='{from_date}', To_Date='{to_date}'")
+        app.logger.debug("Search query: Employee_ID='%s', From_Date='%s', To_Date='%s'", employee_id, from_date, to_date)
         
-        # Start with all records
-        result = current_df.copy()
+        etag = dashboard_etag(store.version, 'search', employee_id, from_date, to_date)
+        if request.if_none_match.contains(etag):
+            return not_modified(etag)
         
-        # Filter by employee ID if provided
-        if employee_id:
-            result = result[result['Employee_ID'].str.lower() == employee_id.lower()]
+        try:
+            body = search_response_body(store, employee_id, from_date, to_date)
+        except ValueError:
+            return jsonify({'error': 'Invalid date', 'message': 'Dates must be in YYYY-MM-DD format.'}), 400
         
-        # Filter by date range if provided
-        if from_date and to_date:
-            result = result[(result['Date'] >= from_date) & (result['Date'] <= to_date)]
-        elif from_date:
-            result = result[result['Date'] >= from_date]
-        elif to_date:
-            result = result[result['Date'] <= to_date]
-        
-        # Check if any records found
-        if result.empty:
-            print(f"No records found for Employee_ID: '{employee_id}', From_Date: '{from_date}', To_Date: '{to_date}'")
-            return jsonify({
-                'records': [],
-                'message': f"No records found for Employee_ID: {employee_id}, From_Date: {from_date}, To_Date: {to_date}"
-            })
-        
-        # Return filtered results
-        display_columns = ['Employee_ID', 'Employee_Name', 'Date', 'Check_In', 'Check_Out',
-                           'Working_Hours', 'Late_Minutes', 'Status', 'Late_Flag', 'Is_Late']
-        
-        # Ensure only columns that exist in the dataframe are selected
-        actual_display_columns = [col for col in display_columns if col in result.columns]
-        
-        return jsonify({
-            'records': result[actual_display_columns].to_dict(orient='records'),
-            'total_records': len(result)
-        })
+        return with_etag(app.response_class(body, mimetype='application/json'), etag)
         
     except Exception as e:
         print(f"Error searching records: {e}")
@@ -219,7 +505,7 @@ def search_records():
 # --- MODIFIED: /api/upload ROUTE to accept two files ---
 @app.route('/api/upload', methods=['POST'])
 def upload_files_and_process():
-    print("POST /api/upload endpoint hit")
+    app.logger.debug("POST /api/upload endpoint hit")
 
     # Check if both files are present in the request
     if 'employee_file' not in request.files or 'attendance_file' not in request.files:
@@ -242,45 +528,46 @@ def upload_files_and_process():
     # For the binary employee file, we generally don't check extension as it might not have one,
     # or it could be a custom binary format. Trust the user's selection here.
 
-    raw_employee_file_path = None # Initialize to None for cleanup in finally block
-    raw_attendance_file_path = None
-
     try:
-        # Secure filenames and save raw files temporarily
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        emp_filename = secure_filename(employee_file.filename)
-        att_filename = secure_filename(attendance_file.filename)
 
-        raw_employee_file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"emp_raw_{timestamp}_{emp_filename}")
-        raw_attendance_file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"att_raw_{timestamp}_{att_filename}")
-        
-        employee_file.save(raw_employee_file_path)
-        attendance_file.save(raw_attendance_file_path)
-        print(f"Raw employee file saved to: {raw_employee_file_path}")
-        print(f"Raw attendance file saved to: {raw_attendance_file_path}")
+        # Hand the uploads to the processor as in-memory buffers; the raw
+        # files are only needed for this one call, so they never touch disk
+        employee_buffer = io.BytesIO(employee_file.read())
+        attendance_buffer = io.BytesIO(attendance_file.read())
+        employee_buffer.name = secure_filename(employee_file.filename)
+        attendance_buffer.name = secure_filename(attendance_file.filename)
+        print(f"Received employee file '{employee_buffer.name}' ({employee_buffer.getbuffer().nbytes} bytes)")
+        print(f"Received attendance file '{attendance_buffer.name}' ({attendance_buffer.getbuffer().nbytes} bytes)")
 
         # Define the output path for the *interactive* Excel file
         output_excel_filename = f"interactive_attendance_charts_{timestamp}.xlsx"
         output_excel_path = os.path.join(app.config['UPLOAD_FOLDER'], output_excel_filename)
-        
-        # Call the biometric processing function from your biometric_processor.py
-        success = process_biometric_data_for_excel_dashboard(
-            raw_employee_file_path, 
-            raw_attendance_file_path, 
-            output_excel_path
-        )
-        
-        if success:
+
+        # Clients that send `Prefer: respond-async` get a job to poll instead
+        # of holding the connection open while the workbook is generated
+        if 'respond-async' in request.headers.get('Prefer', ''):
+            try:
+                remove_expired_jobs()
+            except Exception as e: # Housekeeping must never fail the upload itself
+                print(f"Could not remove expired upload jobs: {e}")
+            job_id = uuid.uuid4().hex
+            write_job_status(job_id, 'queued', queued_at=time.time())
+            upload_executor.submit(run_upload_job, job_id, employee_buffer, attendance_buffer, output_excel_path)
+            status_url = f"/api/job/{job_id}"
+            return jsonify({
+                "message": "Files uploaded; the interactive dashboard is being created.",
+                "job_id": job_id,
+                "status_url": status_url
+            }), 202, {"Location": status_url}
+
+        if process_upload(employee_buffer, attendance_buffer, output_excel_path):
             return jsonify({
                 "message": "Files uploaded and interactive dashboard created successfully!", 
                 "dashboard_file": output_excel_filename,
                 "download_url": f"/api/download-latest-dashboard" # Provide a generic download URL
             }), 200
         else:
-            # If processing failed, but files were saved, ensure the output Excel is removed if incomplete
-            if os.path.exists(output_excel_path):
-                os.remove(output_excel_path)
             return jsonify({"error": "Failed to create interactive dashboard. Check server logs for details."}), 500
 
     except Exception as e:
@@ -288,12 +575,199 @@ def upload_files_and_process():
         import traceback
         traceback.print_exc()
         return jsonify({"error": f"An unexpected error occurred during processing: {str(e)}"}), 500
-    finally:
-        # Ensure raw files are cleaned up even on unexpected errors
-        if raw_employee_file_path and os.path.exists(raw_employee_file_path):
-            os.remove(raw_employee_file_path)
-        if raw_attendance_file_path and os.path.exists(raw_attendance_file_path):
-            os.remove(raw_attendance_file_path)
+
+# --- Upload lock ---
+# One upload is processed at a time across every gunicorn worker: the work is
+# CPU-bound, and each run ends by swapping the dashboard every request reads.
+# flock() on a file in UPLOAD_FOLDER covers the other workers; where fcntl is
+# unavailable (Windows dev server) only this process's uploads are serialized.
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+UPLOAD_LOCK_PATH = os.path.join(UPLOAD_FOLDER, '.upload.lock')
+_upload_thread_lock = threading.Lock()
+
+@contextlib.contextmanager
+def upload_lock():
+    """Wait until no other upload is being processed, then hold the lock."""
+    with _upload_thread_lock, open(UPLOAD_LOCK_PATH, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX) # Released when the file is closed
+        yield
+
+def process_upload(employee_buffer, attendance_buffer, output_excel_path):
+    """Build the dashboard for one upload and make it the one the API serves."""
+    with upload_lock():
+        return _process_upload(employee_buffer, attendance_buffer, output_excel_path)
+
+def _process_upload(employee_buffer, attendance_buffer, output_excel_path):
+    # Import your biometric processing function
+    # Ensure 'biometric_processor.py' is in the same directory as 'app.py'.
+    # It is imported on first use: it pulls in all of openpyxl (styles, charts),
+    # which only uploads need, so workers boot and answer queries sooner.
+    from biometric_processor import process_biometric_data_for_excel_dashboard
+
+    # Call the biometric processing function from your biometric_processor.py
+    success = process_biometric_data_for_excel_dashboard(
+        employee_buffer, 
+        attendance_buffer, 
+        output_excel_path
+    )
+    
+    if success:
+        # Parse the new dashboard once here; this writes its Parquet sidecar,
+        # so API requests read columnar data instead of re-parsing the .xlsx
+        load_biometric_data_from_excel(output_excel_path)
+        # Drop the previous dashboard now rather than on the next request
+        load_bio_store.cache_clear()
+    else:
+        # If processing failed, ensure the output Excel is removed if incomplete
+        if os.path.exists(output_excel_path):
+            os.remove(output_excel_path)
+    return success
+
+# --- Background upload jobs ---
+# Each worker runs its queued uploads one by one (and upload_lock() orders
+# them against the other workers). Job states are small JSON files so any
+# gunicorn worker can answer a status poll; they record the pid and start time
+# of the worker that owns the job, so a job whose worker died is reported as failed.
+JOBS_FOLDER = os.path.join(UPLOAD_FOLDER, 'jobs')
+os.makedirs(JOBS_FOLDER, exist_ok=True)
+upload_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='upload')
+
+# Seconds a finished, failed or abandoned job's status stays available
+JOB_STATUS_TTL = int(os.getenv("JOB_STATUS_TTL", 24 * 60 * 60))
+
+def get_job_status_path(job_id):
+    """JSON file holding the state of one upload job."""
+    return os.path.join(JOBS_FOLDER, f"{job_id}.json")
+
+def write_job_status(job_id, status, **details):
+    """Record a job's state ('queued', 'running', 'done' or 'failed') and return its JSON body."""
+    pid = os.getpid()
+    body = orjson.dumps({
+        'job_id': job_id, 'status': status,
+        'pid': pid, 'pid_start_time': get_process_start_time(pid),
+        **details,
+    })
+    status_path = get_job_status_path(job_id)
+    tmp_path = f"{status_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, status_path)
+    return body
+
+def get_process_start_time(pid):
+    """Start time of process `pid` in clock ticks after boot, or None if /proc has no entry for it."""
+    try:
+        with open(f"/proc/{pid}/stat", 'rb') as f:
+            # The command name (field 2) may contain spaces; starttime is field 22
+            return int(f.read().rsplit(b')', 1)[1].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+def is_process_alive(pid, start_time=None):
+    """Whether the worker `pid` is still running; assumed so where it cannot be probed.
+
+    A pid alone is not enough: after a restart, or in a container whose pids
+    start from 1 again, a dead worker's pid can belong to a new process. Where
+    the start time was recorded, it must match too.
+    """
+    if pid is None:
+        return True
+    if start_time is not None and os.path.isdir('/proc'):
+        return get_process_start_time(pid) == start_time
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True # Exists, owned by another user
+    return True
+
+def is_job_abandoned(job):
+    """A queued or running job whose worker has exited will never finish."""
+    return (job['status'] in ('queued', 'running')
+            and not is_process_alive(job.get('pid'), job.get('pid_start_time')))
+
+def is_job_file_expired(path, cutoff):
+    """Whether a file in JOBS_FOLDER was last written before `cutoff` and can be deleted."""
+    if os.stat(path).st_mtime >= cutoff:
+        return False
+    if not path.endswith('.json'):
+        return True # Stale .tmp files are left behind by workers killed mid-write
+    try:
+        with open(path, 'rb') as f:
+            job = orjson.loads(f.read())
+        return job['status'] not in ('queued', 'running') or is_job_abandoned(job)
+    except (ValueError, KeyError, TypeError):
+        return True # Truncated or corrupt; no poll can use it either
+
+def remove_expired_jobs():
+    """Delete job files that finished, failed or were abandoned over JOB_STATUS_TTL seconds ago."""
+    cutoff = time.time() - JOB_STATUS_TTL
+    with os.scandir(JOBS_FOLDER) as entries:
+        for entry in entries:
+            try:
+                if is_job_file_expired(entry.path, cutoff):
+                    os.remove(entry.path)
+            except OSError:
+                pass # Already removed by another worker
+
+def run_upload_job(job_id, employee_buffer, attendance_buffer, output_excel_path):
+    """Executor task behind an asynchronous /api/upload."""
+    started_at = time.time()
+    write_job_status(job_id, 'running', started_at=started_at)
+    try:
+        success = process_upload(employee_buffer, attendance_buffer, output_excel_path)
+    except Exception as e:
+        print(f"Error during background processing of job {job_id}: {e}")
+        import traceback
+        traceback.print_exc()
+        write_job_status(job_id, 'failed', started_at=started_at, finished_at=time.time(),
+                         error=f"An unexpected error occurred during processing: {str(e)}")
+        return
+    if success:
+        write_job_status(job_id, 'done', started_at=started_at, finished_at=time.time(),
+                         dashboard_file=os.path.basename(output_excel_path),
+                         download_url="/api/download-latest-dashboard")
+    else:
+        write_job_status(job_id, 'failed', started_at=started_at, finished_at=time.time(),
+                         error="Failed to create interactive dashboard. Check server logs for details.")
+
+@app.route('/api/job/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Status of an upload that is being processed in the background."""
+    try:
+        if not job_id.isalnum():
+            raise FileNotFoundError(job_id)
+        with open(get_job_status_path(job_id), 'rb') as f:
+            body = f.read()
+    except FileNotFoundError:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    try:
+        job = orjson.loads(body)
+        abandoned = is_job_abandoned(job)
+    except (ValueError, KeyError, TypeError):
+        print(f"Unreadable status file for job {job_id}")
+        return jsonify({
+            "job_id": job_id,
+            "status": "failed",
+            "error": "The status of this upload could not be read. Please upload the files again."
+        })
+    if abandoned:
+        # The worker was restarted or killed while the job was queued or running
+        details = {k: v for k, v in job.items() if k not in ('job_id', 'status')}
+        body = write_job_status(job_id, 'failed', **{
+            **details,
+            'finished_at': time.time(),
+            'error': "The worker processing this upload stopped before it finished. Please upload the files again.",
+        })
+    return app.response_class(body, mimetype='application/json')
 
 # MODIFIED: Route to allow downloading the *latest* generated interactive Excel file
 @app.route('/api/download-latest-dashboard', methods=['GET'])
@@ -313,6 +787,9 @@ def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
 
+# Load the latest dashboard at import time so that, under `gunicorn --preload`,
+# workers are forked with the data already in shared memory.
+get_bio_store()
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 10000))
@@ -3,95 +3,152 @@ Enhanced Biometric System with Truly Interactive Excel Charts
 Charts update dynamically based on employee selection
 """
 
+import numpy as np
 import pandas as pd
+import argparse
 import datetime
+import contextlib
+import io
+import mmap
 import os
 import re
-import sys
 import traceback
+import warnings
+from copy import copy
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.chart import PieChart, BarChart, LineChart, Reference
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
-from openpyxl.worksheet.table import Table, TableStyleInfo
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+from openpyxl.worksheet.filters import AutoFilter
 # Import DataLabelList from openpyxl.chart.label
 from openpyxl.chart.label import DataLabelList 
 
 
+# --- Input helpers: raw files may be paths or in-memory uploads ---
+def is_file_like(source):
+    """True for open binary files/buffers such as io.BytesIO, False for paths."""
+    return hasattr(source, 'read')
+
+def describe_source(source):
+    """Name of a raw input for log messages."""
+    return getattr(source, 'name', 'in-memory upload') if is_file_like(source) else source
+
+def read_source_bytes(source):
+    """Return the full contents of a path or a binary file-like object."""
+    if is_file_like(source):
+        source.seek(0) # The same buffer may be read more than once
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+@contextlib.contextmanager
+def source_buffer(source):
+    """Contents of a path or a binary file-like object as a bytes-like buffer.
+
+    Paths are memory-mapped read-only, so the OS pages the file in as it is
+    scanned instead of the whole file being copied onto the heap first.
+    """
+    if is_file_like(source):
+        yield read_source_bytes(source)
+        return
+    with open(source, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0: # Empty files cannot be mapped
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+# --- Binary employee file patterns ---
+# A name is a run of at least 3 letters/spaces, containing a letter, that ends
+# at a NUL or other non-printable byte; longer runs are cut to 50 characters
+EMPLOYEE_NAME_RE = re.compile(rb'(?=[ ]{0,49}[A-Za-z])(?:[A-Za-z ]{50}|[A-Za-z ]{3,49}(?![\x20-\x7e]))')
+# An employee ID is the first 1-3 digits that are not followed by another digit
+EMPLOYEE_ID_RE = re.compile(rb'[0-9]{1,3}(?![0-9])')
+NUL_RUN_RE = re.compile(rb'\x00*')
+# Fallback parser: "NameID" pairs in the file's printable text
+WHITESPACE_RUN_RE = re.compile(rb'\s+')
+NAME_ID_PAIR_RE = re.compile(rb'([A-Za-z][A-Za-z]*?)(\d{1,3})(?=[A-Z]|\s|$)')
+# bytes.translate() table keeping printable ASCII and turning the rest into spaces
+PRINTABLE_OR_SPACE = bytes(b if 32 <= b <= 126 else 32 for b in range(256))
+TRANSLATE_CHUNK_SIZE = 1 << 20
+
+# Columns of the punch DataFrame returned by parse_attendance_file
+ATTENDANCE_COLUMNS = ['employee_id', 'datetime']
+# Check-ins after 9:30 are late
+OFFICE_START_SECONDS = 9 * 3600 + 30 * 60
+# Status column dtype: comparisons and isin() on it work on small integer codes
+STATUS_DTYPE = pd.CategoricalDtype(['PRESENT', 'HALF_DAY', 'ABSENT'])
+# Main_Data records start below its title, a blank row and the header row
+MAIN_DATA_FIRST_ROW = 4
+# Hidden sheet listing the "ID - Name" options of the employee dropdowns
+EMPLOYEE_LIST_SHEET = "Employee_List"
+# Hidden sheet with each employee's last CHART_DAYS days, one fixed-size block
+# per dropdown option (in the same order), for the dashboard charts; the first
+# PUNCTUALITY_WEEKS rows of a block also hold its weekly on-time/late counts
+CHART_DATA_SHEET = "Chart_Data"
+CHART_DAYS = 30
+PUNCTUALITY_WEEKS = 4
+
+# --- Shared cell styles ---
+# Assigned by reference so each cell doesn't construct its own style objects
+CENTER = Alignment(horizontal='center')
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+SHEET_TITLE_FONT = Font(bold=True, size=18, color="2C3E50")
+SECTION_FONT = Font(bold=True, size=14, color="2C3E50")
+SUBHEADER_FILL = PatternFill(start_color="E6E6FA", end_color="E6E6FA", fill_type="solid")
+BOLD_FONT = Font(bold=True)
+BODY_FONT = Font(size=11)
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+# Main_Data row colours: late, absent, present/on time
+LATE_FILL = PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid")
+ABSENT_FILL = PatternFill(start_color="FFF2E6", end_color="FFF2E6", fill_type="solid")
+PRESENT_FILL = PatternFill(start_color="E6F7E6", end_color="E6F7E6", fill_type="solid")
+
 # --- Existing functions (no changes needed for now) ---
 def parse_binary_employee_file(file_path):
-    """Parse binary employee file using the working method"""
-    print(f"📖 Reading binary employee file: {file_path}")
+    """Parse binary employee file using the working method.
+
+    `file_path` may also be a binary file-like object, e.g. an io.BytesIO upload.
+    """
+    print(f"📖 Reading binary employee file: {describe_source(file_path)}")
     
-    if not os.path.exists(file_path):
+    if not is_file_like(file_path) and not os.path.exists(file_path):
         print(f"❌ Employee file not found: {file_path}")
         return {}
     
     try:
-        with open(file_path, 'rb') as f:
-            data = f.read()
-        
-        print(f"📊 File size: {len(data)} bytes")
-        employees = {}
-        pos = 0
-        
-        # Parse binary records
-        while pos < len(data) - 10:
-            name_start = pos
-            name_end = pos
+        with source_buffer(file_path) as data:
+            print(f"📊 File size: {len(data)} bytes")
+            employees = {}
+            pos = 0
             
-            # Find printable characters (potential name)
-            while name_end < len(data) and name_end < pos + 50:
-                if data[name_end] == 0:
+            # Parse binary records: each regex search finds the next name, so
+            # the scan runs in C instead of testing one byte per loop iteration
+            while True:
+                name_match = EMPLOYEE_NAME_RE.search(data, pos)
+                if name_match is None or name_match.start() >= len(data) - 10:
                     break
-                if not (32 <= data[name_end] <= 126):
-                    break
-                name_end += 1
-            
-            # Extract potential name
-            if name_end > name_start + 2:
-                try:
-                    potential_name = data[name_start:name_end].decode('latin-1', errors='ignore')
-                    
-                    if potential_name and re.match(r'^[A-Za-z][A-Za-z\s]*$', potential_name.strip()):
-                        name = potential_name.strip()
-                        
-                        # Look for ID after the name
-                        id_search_start = name_end
-                        while id_search_start < len(data) and data[id_search_start] == 0:
-                            id_search_start += 1
-                        
-                        # Look for numeric ID in the next 100 bytes
-                        for id_pos in range(id_search_start, min(id_search_start + 100, len(data))):
-                            if data[id_pos] == 0:
-                                continue
-                            
-                            id_end = id_pos
-                            while id_end < len(data) and id_end < id_pos + 10:
-                                if data[id_end] == 0:
-                                    break
-                                if not (48 <= data[id_end] <= 57):
-                                    break
-                                id_end += 1
-                            
-                            if id_end > id_pos:
-                                try:
-                                    potential_id = data[id_pos:id_end].decode('latin-1', errors='ignore')
-                                    if potential_id.isdigit() and len(potential_id) <= 3:
-                                        employees[potential_id] = name
-                                        print(f"   Found: {potential_id} -> {name}")
-                                        break
-                                except:
-                                    continue
-                        
-                        pos = name_end + 50
-                    else:
-                        pos += 1
-                except:
-                    pos += 1
-            else:
-                pos += 1
+                name = name_match.group().decode('latin-1').strip()
+                name_end = name_match.end()
+                
+                # Look for a numeric ID in the 100 bytes after the name's NUL padding
+                id_search_start = NUL_RUN_RE.match(data, name_end).end()
+                id_match = EMPLOYEE_ID_RE.search(data, id_search_start, id_search_start + 104)
+                if id_match and id_match.start() < id_search_start + 100:
+                    potential_id = id_match.group().decode('latin-1')
+                    employees[potential_id] = name
+                    print(f"   Found: {potential_id} -> {name}")
+                
+                pos = name_end + 50
         
         print(f"✅ Loaded {len(employees)} employees from binary file")
         return employees
@@ -101,157 +158,129 @@ def parse_binary_employee_file(file_path):
         return {}
 
 def extract_names_and_ids_from_binary(data):
-    """Alternative method to extract names and IDs from binary data"""
+    """Alternative method to extract names and IDs from binary data.
+
+    `data` may be bytes or any sliceable buffer, such as a memory-mapped file.
+    """
     employees = {}
     
-    text_data = ""
-    for byte in data:
-        if 32 <= byte <= 126:
-            text_data += chr(byte)
-        else:
-            text_data += " "
+    # Non-printable bytes become spaces, in C-level passes over 1 MB slices
+    # (so a mapped file is never copied whole); the text stays as bytes and
+    # only the matched names and IDs are decoded
+    text_data = b''.join(data[i:i + TRANSLATE_CHUNK_SIZE].translate(PRINTABLE_OR_SPACE)
+                         for i in range(0, len(data), TRANSLATE_CHUNK_SIZE))
     
-    text_data = re.sub(r'\s+', ' ', text_data).strip()
-    pattern = r'([A-Za-z][A-Za-z]*?)(\d{1,3})(?=[A-Z]|\s|$)'
-    matches = re.findall(pattern, text_data)
+    text_data = WHITESPACE_RUN_RE.sub(b' ', text_data).strip()
+    matches = NAME_ID_PAIR_RE.findall(text_data)
     
     for name, emp_id in matches:
         if name and emp_id:
+            name, emp_id = name.decode('ascii'), emp_id.decode('ascii')
             employees[emp_id] = name
             print(f"   {emp_id}: {name}")
     
     return employees
 
 def parse_attendance_file(file_path):
-    """Parse tab-separated attendance file"""
-    print(f"📖 Reading attendance file: {file_path}")
+    """Parse tab-separated attendance file.
+
+    `file_path` may also be a binary file-like object, e.g. an io.BytesIO upload.
+    Returns a DataFrame with one row per punch: 'employee_id' (str) and
+    'datetime' (datetime64).
+    """
+    print(f"📖 Reading attendance file: {describe_source(file_path)}")
     
-    if not os.path.exists(file_path):
+    if not is_file_like(file_path) and not os.path.exists(file_path):
         print(f"❌ Attendance file not found: {file_path}")
-        return []
+        return pd.DataFrame(columns=ATTENDANCE_COLUMNS)
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        records = []
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            parts = line.split('\t')
-            
-            if len(parts) >= 2:
-                try:
-                    emp_id = parts[0].strip()
-                    datetime_str = parts[1].strip()
-                    
-                    if not emp_id.isdigit():
-                        continue
-                    
-                    datetime_obj = datetime.datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S")
-                    
-                    record = {
-                        'employee_id': emp_id,
-                        'datetime': datetime_obj,
-                        'date': datetime_obj.date(),
-                        'time': datetime_obj.time()
-                    }
-                    
-                    records.append(record)
-                    
-                except Exception as e: # Catch specific parsing errors for better debug
-                    print(f"Skipping malformed attendance line: {line}. Error: {e}")
-                    continue
+        # newline=None splits on \n, \r\n and \r, like opening in text mode
+        text = io.StringIO(read_source_bytes(file_path).decode('utf-8'), newline=None).read()
+        lines = pd.Series(text.split('\n'), dtype=object).str.strip()
+        
+        # Only the first two tab-separated fields are used: ID and timestamp
+        parts = lines.str.split('\t', n=2, expand=True).reindex(columns=[0, 1])
+        emp_ids = parts[0].str.strip()
+        datetime_strs = parts[1].str.strip()
+        usable = datetime_strs.notna() & emp_ids.str.isdigit()
+        
+        # One vectorized parse instead of strptime() per line; cache=True
+        # parses each distinct timestamp string only once
+        datetimes = pd.to_datetime(datetime_strs[usable], format="%Y-%m-%d %H:%M:%S", errors='coerce', cache=True)
+        parsed = datetimes.notna()
+        malformed = ~parsed
+        for line, datetime_str in zip(lines[usable][malformed], datetime_strs[usable][malformed]):
+            print(f"Skipping malformed attendance line: {line}. Error: time data '{datetime_str}' does not match format '%Y-%m-%d %H:%M:%S'")
+        
+        records = pd.DataFrame({
+            'employee_id': emp_ids[usable][parsed].to_numpy(),
+            'datetime': datetimes[parsed].to_numpy(),
+        })
         
         print(f"✅ Parsed {len(records)} attendance records")
         return records
         
     except Exception as e:
         print(f"❌ Error parsing attendance file: {e}")
-        return []
+        return pd.DataFrame(columns=ATTENDANCE_COLUMNS)
 
 def process_attendance_data(records, employees):
-    """Process attendance records into daily summary"""
+    """Process attendance records (as returned by parse_attendance_file) into daily summary.
+
+    Returns (processed_data, summary): a DataFrame with one row per
+    employee-day, in the order each employee-day first appears in the
+    attendance file, and the counts print_summary reports for it.
+    """
     print("⚙️ Processing attendance data...")
     
-    daily_data = {}
-    
-    for record in records:
-        emp_id = record['employee_id']
-        emp_name = employees.get(emp_id, f"Unknown_{emp_id}")
-        date = record['date']
-        time_obj = record['time']
-        
-        key = (emp_id, emp_name, date)
-        
-        if key not in daily_data:
-            daily_data[key] = {
-                'employee_id': emp_id,
-                'employee_name': emp_name,
-                'date': date,
-                'times': []
-            }
-        
-        daily_data[key]['times'].append(time_obj)
-    
-    processed_data = []
-    office_start = datetime.time(9, 30)
-    
-    for key, data in daily_data.items():
-        times = sorted(data['times'])
-        
-        check_in = times[0] if times else None
-        check_out = times[-1] if len(times) > 1 else None
-        
-        working_hours = 0
-        if check_in and check_out:
-            check_in_dt = datetime.datetime.combine(data['date'], check_in)
-            check_out_dt = datetime.datetime.combine(data['date'], check_out)
-            working_hours = (check_out_dt - check_in_dt).total_seconds() / 3600
-        
-        is_late = False
-        late_minutes = 0
-        if check_in:
-            if check_in > office_start:
-                late_minutes = (datetime.datetime.combine(data['date'], check_in) - 
-                                datetime.datetime.combine(data['date'], office_start)).total_seconds() / 60
-                is_late = True  # Flag as late if check-in is after 9:30
-        
-        if not check_in:
-            status = "ABSENT"
-        elif working_hours >= 7:
-            status = "PRESENT"
-        elif working_hours >= 4:
-            status = "HALF_DAY"
-        else:
-            status = "PRESENT" # If working hours are less than 4 but check-in exists, assume present.
-        
-        if not check_in:
-            late_flag = "❌ ABSENT"
-        elif is_late:
-            late_flag = "🚩 LATE"
-        else:
-            late_flag = "✅ ON TIME"
-        
-        processed_record = {
-            'Employee_ID': data['employee_id'],
-            'Employee_Name': data['employee_name'],
-            'Date': data['date'].strftime('%Y-%m-%d'),
-            'Check_In': check_in.strftime('%H:%M:%S') if check_in else 'N/A',
-            'Check_Out': check_out.strftime('%H:%M:%S') if check_out else 'N/A',
-            'Working_Hours': round(working_hours, 2),
-            'Late_Minutes': int(late_minutes),
-            'Status': status,
-            'Late_Flag': late_flag,
-            'Is_Late': is_late
-        }
-        
-        processed_data.append(processed_record)
+    # First punch, last punch and punch count for every employee-day at once
+    punches = records.assign(date=records['datetime'].dt.normalize())
+    daily = (punches.groupby(['employee_id', 'date'], sort=False)['datetime']
+             .agg(['min', 'max', 'count'])
+             .reset_index())
+    emp_ids = daily['employee_id']
+    check_in = daily['min']
+    has_check_out = daily['count'] > 1 # A single punch is a check-in only
+    
+    working_hours = ((daily['max'] - check_in).dt.total_seconds() / 3600).where(has_check_out, 0.0)
+    
+    # Late if checked in after 9:30, by whole minutes after 9:30
+    late_seconds = (check_in - daily['date']).dt.total_seconds() - OFFICE_START_SECONDS
+    is_late = late_seconds > 0
+    late_minutes = (late_seconds // 60).where(is_late, 0).astype(int)
+    
+    # Working hours below 4 with a check-in are still counted as present.
+    # Built straight from category codes, so no status strings are compared.
+    status_codes = np.select([working_hours >= 7, working_hours >= 4], [0, 1], default=0)
+    status = pd.Categorical.from_codes(status_codes, dtype=STATUS_DTYPE)
+    
+    processed_data = pd.DataFrame({
+        'Employee_ID': emp_ids,
+        'Employee_Name': emp_ids.map(employees).fillna("Unknown_" + emp_ids),
+        'Date': daily['date'].dt.strftime('%Y-%m-%d'),
+        'Check_In': check_in.dt.strftime('%H:%M:%S'),
+        'Check_Out': daily['max'].dt.strftime('%H:%M:%S').where(has_check_out, 'N/A'),
+        # Python's round() is correctly rounded, unlike Series.round()
+        'Working_Hours': [round(hours, 2) for hours in working_hours.tolist()],
+        'Late_Minutes': late_minutes,
+        'Status': status,
+        'Late_Flag': np.where(is_late, "🚩 LATE", "✅ ON TIME"),
+        'Is_Late': is_late,
+    })
+    
+    # Summary counts from the arrays already at hand; every row is a distinct employee-day
+    present_count = int((status_codes < 2).sum()) # PRESENT and HALF_DAY are the first two categories
+    summary = {
+        'total_employees': emp_ids.nunique(),
+        'present_count': present_count,
+        'late_count': int(is_late.sum()),
+        'total_days_recorded': len(processed_data),
+        'present_days_recorded': present_count,
+    }
     
     print(f"✅ Processed data for {len(processed_data)} employee-day records")
-    return processed_data
+    return processed_data, summary
 
 def create_interactive_excel_report(data, employees, output_file):
     """Create Excel report with truly interactive charts"""
@@ -259,20 +288,40 @@ def create_interactive_excel_report(data, employees, output_file):
     
     try:
         df = pd.DataFrame(data)
-        wb = Workbook()
-        wb.remove(wb.active)
+        # Write-only workbook: appended rows are streamed out instead of
+        # every cell of the (large) Main_Data sheet staying in memory
+        wb = Workbook(write_only=True)
         
         # Sheet 1: Main Data
-        create_main_data_sheet(wb, df, data)
+        create_main_data_sheet(wb, df)
+        # Last Main_Data row, so formulas scan only the records, not whole columns
+        data_end_row = max(MAIN_DATA_FIRST_ROW + len(df) - 1, MAIN_DATA_FIRST_ROW)
+        
+        # "ID - Name" options for the employee dropdowns, built once
+        employee_list = sorted([f"{emp_id} - {name}" for emp_id, name in employees.items()])
+        # Weeks shown in the punctuality analysis
+        weeks = recent_weeks(df)
+        
+        # Sheets 2-4 place cells by address, so they are drafted in a regular
+        # workbook and then streamed into the report row by row
+        drafts = Workbook()
+        drafts.remove(drafts.active)
         
         # Sheet 2: Interactive Employee Dashboard
-        create_interactive_dashboard(wb, df, employees)
+        create_interactive_dashboard(drafts, df, employee_list, data_end_row)
         
         # Sheet 3: Employee Trends
-        create_employee_trends_sheet(wb, df, employees)
+        create_employee_trends_sheet(drafts, df, employee_list, data_end_row, weeks)
         
         # Sheet 4: Comparison Charts
-        create_comparison_sheet(wb, df)
+        create_comparison_sheet(drafts, df)
+        
+        for draft in drafts.worksheets:
+            copy_sheet_to_write_only(draft, wb)
+        
+        # Hidden sheets holding the dropdown options and the chart blocks
+        create_employee_list_sheet(wb, employee_list)
+        create_chart_data_sheet(wb, df, employee_list, weeks)
         
         wb.save(output_file)
         print(f"✅ Interactive Excel report created successfully!")
@@ -283,41 +332,162 @@ def create_interactive_excel_report(data, employees, output_file):
         traceback.print_exc()
         return False
 
-def create_main_data_sheet(wb, df, data):
+def main_data_column(col, data_end_row):
+    """Absolute reference to the records in column `col` of Main_Data, e.g. Main_Data!$C$4:$C$503"""
+    return f"Main_Data!${col}${MAIN_DATA_FIRST_ROW}:${col}${data_end_row}"
+
+def create_employee_list_sheet(wb, employee_list):
+    """Write the dropdown options once, to a hidden sheet both dropdowns read"""
+    ws = wb.create_sheet(EMPLOYEE_LIST_SHEET)
+    ws.sheet_state = 'hidden'
+    for emp in employee_list:
+        ws.append([emp])
+
+def recent_weeks(df):
+    """Monday of each of the last PUNCTUALITY_WEEKS weeks up to the latest record, oldest first"""
+    last_date = pd.to_datetime(df['Date']).max() if not df.empty else pd.Timestamp(datetime.date.today())
+    last_monday = last_date.normalize() - pd.Timedelta(days=last_date.weekday())
+    return [last_monday - pd.Timedelta(weeks=n) for n in range(PUNCTUALITY_WEEKS - 1, -1, -1)]
+
+def weekly_punctuality_counts(df, weeks):
+    """{(employee ID, week Monday): (on-time days, late days)} for the given weeks"""
+    dates = pd.to_datetime(df['Date'])
+    counts = pd.DataFrame({
+        'Employee_ID': df['Employee_ID'],
+        'Week': dates.dt.normalize() - pd.to_timedelta(dates.dt.weekday, unit='D'),
+        'On_Time': (df['Status'] != 'ABSENT') & ~df['Is_Late'],
+        'Late': df['Is_Late'],
+    })
+    counts = counts[counts['Week'] >= weeks[0]].groupby(['Employee_ID', 'Week'])[['On_Time', 'Late']].sum()
+    return {key: (on_time, late) for key, on_time, late in counts.itertuples(name=None)}
+
+def create_chart_data_sheet(wb, df, employee_list, weeks):
+    """Write each employee's last CHART_DAYS days as a block the dashboard indexes into"""
+    ws = wb.create_sheet(CHART_DATA_SHEET)
+    ws.sheet_state = 'hidden'
+    
+    # One sort for everyone instead of Excel searching Main_Data per chart cell
+    columns = ['Date', 'Working_Hours', 'Status', 'Is_Late']
+    last_days = df.sort_values('Date', kind='stable').groupby('Employee_ID', sort=False).tail(CHART_DAYS)
+    blocks = {emp_id: list(zip(*(group[col].tolist() for col in columns)))
+              for emp_id, group in last_days.groupby('Employee_ID', sort=False)}
+    week_counts = weekly_punctuality_counts(df, weeks)
+    
+    # Block k starts at row (k - 1) * CHART_DAYS + 1; short blocks are padded
+    # with empty strings so the dashboard shows blanks, not zeros. Weekly
+    # counts go in columns F:G of the block's first rows.
+    padding = [''] * len(columns)
+    for option in employee_list:
+        emp_id = option.split(' - ', 1)[0]
+        block = blocks.get(emp_id, [])
+        for day in range(CHART_DAYS):
+            row = list(block[day]) if day < len(block) else list(padding)
+            if day < len(weeks):
+                row += [None, *week_counts.get((emp_id, weeks[day]), (0, 0))]
+            ws.append(row)
+
+def add_employee_dropdown(ws, cell_ref, employee_list):
+    """Add the employee dropdown to `cell_ref`, with the first employee selected"""
+    # Data validation dropdown
+    dv = DataValidation(
+        type="list",
+        formula1=f"={EMPLOYEE_LIST_SHEET}!$A$1:$A${len(employee_list)}", # Absolute reference
+        showDropDown=True
+    )
+    dv.add(ws[cell_ref])
+    ws.add_data_validation(dv)
+    
+    # Set default selection
+    ws[cell_ref] = employee_list[0] if employee_list else ""
+
+def copy_cell(ws, cell):
+    """Copy of a drafted cell's value and style, for appending to write-only `ws`"""
+    if not cell.has_style:
+        return cell.value
+    new_cell = WriteOnlyCell(ws, value=cell.value)
+    new_cell.font = copy(cell.font)
+    new_cell.fill = copy(cell.fill)
+    new_cell.border = copy(cell.border)
+    new_cell.alignment = copy(cell.alignment)
+    new_cell.number_format = cell.number_format
+    new_cell.protection = copy(cell.protection)
+    return new_cell
+
+def copy_sheet_to_write_only(draft, wb):
+    """Stream a sheet drafted in a regular workbook into write-only `wb`"""
+    ws = wb.create_sheet(draft.title)
+    
+    # Column widths must be set before the first row is written
+    for col_letter, dimension in draft.column_dimensions.items():
+        if dimension.width:
+            ws.column_dimensions[col_letter].width = dimension.width
+    
+    for row in draft.iter_rows(min_row=1, min_col=1):
+        ws.append([copy_cell(ws, cell) for cell in row])
+    
+    for merged_range in draft.merged_cells.ranges:
+        ws.merged_cells.add(merged_range.coord)
+    for dv in draft.data_validations.dataValidation:
+        ws.data_validations.append(dv)
+    # openpyxl has no public accessor for a sheet's charts; _charts is the list
+    # add_chart() appends to (checked against openpyxl 3.1.5, pinned in requirements.txt)
+    for chart in draft._charts:
+        ws.add_chart(chart) # Keeps the anchor it was added with
+    return ws
+
+def create_main_data_sheet(wb, df):
     """Create main data sheet with Excel table for filtering"""
     ws = wb.create_sheet("Main_Data")
+    headers = list(df.columns)
+    
+    # Auto-adjust columns (before any row is written)
+    for col_num in range(1, len(headers) + 1):
+        ws.column_dimensions[get_column_letter(col_num)].width = 15
     
     # Title
-    ws['A1'] = f"Biometric Attendance Data - {datetime.date.today().strftime('%B %d, %Y')}"
-    ws['A1'].font = Font(bold=True, size=16, color="2C3E50")
-    ws.merge_cells('A1:J1')
-    ws['A1'].alignment = Alignment(horizontal='center')
+    title = WriteOnlyCell(ws, value=f"Biometric Attendance Data - {datetime.date.today().strftime('%B %d, %Y')}")
+    title.font = Font(bold=True, size=16, color="2C3E50")
+    title.alignment = CENTER
+    ws.append([title])
+    ws.merged_cells.add('A1:J1')
+    ws.append([])
     
     # Headers
-    headers = list(df.columns)
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=3, column=col, value=header)
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        cell.alignment = Alignment(horizontal='center')
-    
-    # Data
-    for row_idx, record in enumerate(data, 4):
-        for col_idx, (key, value) in enumerate(record.items(), 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            cell.alignment = Alignment(horizontal='center')
-            
-            # Color coding
-            if record['Is_Late']:
-                cell.fill = PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid")
-            elif record['Status'] == 'ABSENT':
-                cell.fill = PatternFill(start_color="FFF2E6", end_color="FFF2E6", fill_type="solid")
-            else:
-                cell.fill = PatternFill(start_color="E6F7E6", end_color="E6F7E6", fill_type="solid")
+    header_row = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = CENTER
+        header_row.append(cell)
+    ws.append(header_row)
+    
+    # Color coding: each row's fill is picked for all rows at once
+    row_fills = np.select([df['Is_Late'].astype(bool), df['Status'] == 'ABSENT'],
+                          [0, 1], default=2)
+    fills = [LATE_FILL, ABSENT_FILL, PRESENT_FILL]
+    
+    # Data, one appended row per record (plain Python values via tolist())
+    records = zip(*(df[col].tolist() for col in headers))
+    for record, fill_index in zip(records, row_fills.tolist()):
+        fill = fills[fill_index]
+        row = []
+        for value in record:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.alignment = CENTER
+            cell.fill = fill
+            row.append(cell)
+        ws.append(row)
     
     # Create Excel Table for better filtering
-    table_range = f"A3:{get_column_letter(len(headers))}{len(data) + 3}"
-    table = Table(displayName="AttendanceData", ref=table_range)
+    table_range = f"A3:{get_column_letter(len(headers))}{len(df) + 3}"
+    # Write-only sheets can't be read back, so the columns are named here
+    table = Table(
+        displayName="AttendanceData",
+        ref=table_range,
+        tableColumns=[TableColumn(id=i, name=header) for i, header in enumerate(headers, 1)],
+        autoFilter=AutoFilter(ref=table_range),
+    )
     
     # Add table style
     style = TableStyleInfo(
@@ -328,13 +498,12 @@ def create_main_data_sheet(wb, df, data):
         showColumnStripes=True
     )
     table.tableStyleInfo = style
-    ws.add_table(table)
-    
-    # Auto-adjust columns
-    for col_num in range(1, len(headers) + 1):
-        ws.column_dimensions[get_column_letter(col_num)].width = 15
+    with warnings.catch_warnings():
+        # openpyxl warns about every write-only table; its columns are named above
+        warnings.simplefilter('ignore', UserWarning)
+        ws.add_table(table)
 
-def create_interactive_dashboard(wb, df, employees):
+def create_interactive_dashboard(wb, df, employee_list, data_end_row):
     """Create interactive dashboard with employee-specific charts"""
     ws = wb.create_sheet("Interactive_Dashboard")
     
@@ -342,40 +511,24 @@ def create_interactive_dashboard(wb, df, employees):
     ws['B2'] = "🎯 Interactive Employee Dashboard"
     ws['B2'].font = Font(bold=True, size=20, color="2C3E50")
     ws.merge_cells('B2:J2')
-    ws['B2'].alignment = Alignment(horizontal='center')
+    ws['B2'].alignment = CENTER
     
     # Employee Selection
     ws['B4'] = "Select Employee:"
     ws['B4'].font = Font(bold=True, size=14)
     
     # Create employee dropdown
-    employee_list = sorted([f"{emp_id} - {name}" for emp_id, name in employees.items()])
-    
-    # Write employee list in hidden area
-    for i, emp in enumerate(employee_list, 1):
-        ws.cell(row=i, column=20, value=emp)  # Column T
-    
-    # Data validation dropdown
-    dv = DataValidation(
-        type="list",
-        formula1=f"=$T$1:$T${len(employee_list)}", # Absolute reference
-        showDropDown=True
-    )
-    dv.add(ws['C4'])
-    ws.add_data_validation(dv)
-    
-    # Set default selection
-    ws['C4'] = employee_list[0] if employee_list else ""
+    add_employee_dropdown(ws, 'C4', employee_list)
     
     # Create dynamic data area for selected employee
-    create_dynamic_employee_data(ws, df)
+    create_dynamic_employee_data(ws, df, data_end_row)
     
     # Create interactive charts
     create_interactive_charts(ws)
     
     # Add instructions
     ws['B35'] = "📋 How to Use:"
-    ws['B35'].font = Font(bold=True, size=14, color="2C3E50")
+    ws['B35'].font = SECTION_FONT
     
     instructions = [
         "1. Select an employee from the dropdown in cell C4",
@@ -386,44 +539,43 @@ def create_interactive_dashboard(wb, df, employees):
     
     for i, instruction in enumerate(instructions, 36):
         ws[f'B{i}'] = instruction
-        ws[f'B{i}'].font = Font(size=11)
+        ws[f'B{i}'].font = BODY_FONT
 
-def create_dynamic_employee_data(ws, df):
+def create_dynamic_employee_data(ws, df, data_end_row):
     """Create dynamic data area that updates based on employee selection"""
     
     # Employee metrics section
     ws['B6'] = "📊 Employee Metrics"
-    ws['B6'].font = Font(bold=True, size=14, color="2C3E50")
+    ws['B6'].font = SECTION_FONT
     
     # Extract employee ID from dropdown selection
     emp_id_formula = 'LEFT(C4,FIND(" ",C4)-1)'
     
+    # Main_Data columns, bounded to the rows that hold records
+    ids, dates, check_ins, hours, statuses, late = (
+        main_data_column(col, data_end_row) for col in ['C', 'D', 'E', 'G', 'J', 'K'])
+    
     # Dynamic metrics with formulas
     metrics = [
         ("Employee ID:", f'={emp_id_formula}'),
         ("Employee Name:", f'=RIGHT(C4,LEN(C4)-FIND(" - ",C4)-2)'),
-        ("Total Records:", f'=COUNTIF(Main_Data!C:C,{emp_id_formula})'), # Use full column reference
-        ("Present Days:", f'=COUNTIFS(Main_Data!C:C,{emp_id_formula},Main_Data!J:J,"PRESENT")'), # Adjusted for Status column
-        ("Late Days:", f'=COUNTIFS(Main_Data!C:C,{emp_id_formula},Main_Data!K:K,TRUE)'), # Adjusted for Is_Late column
-        ("Average Hours:", f'=ROUND(AVERAGEIFS(Main_Data!G:G,Main_Data!C:C,{emp_id_formula},Main_Data!G:G,">0"),2)'), # Adjusted for Working_Hours
+        ("Total Records:", f'=COUNTIF({ids},{emp_id_formula})'),
+        ("Present Days:", f'=COUNTIFS({ids},{emp_id_formula},{statuses},"PRESENT")'), # Adjusted for Status column
+        ("Late Days:", f'=COUNTIFS({ids},{emp_id_formula},{late},TRUE)'), # Adjusted for Is_Late column
+        ("Average Hours:", f'=ROUND(AVERAGEIFS({hours},{ids},{emp_id_formula},{hours},">0"),2)'), # Adjusted for Working_Hours
         ("Punctuality Rate:", f'=IF(D10>0,TEXT((D10-D11)/D10,"0.0%"),"0%")'), # Changed to TEXT for percentage format
-        ("Last Check-in:", f'=INDEX(Main_Data!E:E,MATCH(1,(Main_Data!C:C={emp_id_formula})*(Main_Data!D:D=MAXIFS(Main_Data!D:D,Main_Data!C:C,{emp_id_formula})),0))'), # Adjusted for Check_In, Date, Employee_ID
+        ("Last Check-in:", f'=INDEX({check_ins},MATCH(1,({ids}={emp_id_formula})*({dates}=MAXIFS({dates},{ids},{emp_id_formula})),0))'), # Adjusted for Check_In, Date, Employee_ID
     ]
     
     for i, (label, formula) in enumerate(metrics, 8):
         ws[f'B{i}'] = label
-        ws[f'B{i}'].font = Font(bold=True)
+        ws[f'B{i}'].font = BOLD_FONT
         ws[f'D{i}'] = formula
-        ws[f'D{i}'].font = Font(size=11)
+        ws[f'D{i}'].font = BODY_FONT
         
         # Add borders
         for col in ['B', 'D']:
-            ws[f'{col}{i}'].border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
+            ws[f'{col}{i}'].border = THIN_BORDER
     
     # Create dynamic chart data area
     create_chart_data_area(ws, df)
@@ -445,24 +597,20 @@ def create_chart_data_area(ws, df):
     
     # Headers for chart data
     for col in ['B', 'C', 'D', 'E']:
-        ws[f'{col}{chart_start + 2}'].font = Font(bold=True)
-        ws[f'{col}{chart_start + 2}'].fill = PatternFill(start_color="E6E6FA", end_color="E6E6FA", fill_type="solid")
+        ws[f'{col}{chart_start + 2}'].font = BOLD_FONT
+        ws[f'{col}{chart_start + 2}'].fill = SUBHEADER_FILL
     
-    # Create formulas to get last 30 days of data for selected employee
-    emp_id_formula = 'LEFT(C4,FIND(" ",C4)-1)'
+    # Last 30 days of the selected employee, read from their precomputed
+    # block in the hidden chart data sheet
+    block_start = f'(MATCH($C$4,{EMPLOYEE_LIST_SHEET}!$A:$A,0)-1)*{CHART_DAYS}'
     
-    # Number of rows for dynamic data (e.g., up to 100 rows for flexibility)
-    max_chart_rows = 100 
-
-    for row_num in range(chart_start + 3, chart_start + 3 + max_chart_rows):
-        # Date column
-        ws[f'B{row_num}'].value = f'=IFERROR(INDEX(Main_Data!$D:$D,SMALL(IF(Main_Data!$C:$C={emp_id_formula},ROW(Main_Data!$D:$D)),ROW()-ROW($B${chart_start+3})+1)),"")'
-        # Hours column
-        ws[f'C{row_num}'].value = f'=IFERROR(INDEX(Main_Data!$G:$G,SMALL(IF(Main_Data!$C:$C={emp_id_formula},ROW(Main_Data!$G:$G)),ROW()-ROW($C${chart_start+3})+1)),"")'
-        # Status column
-        ws[f'D{row_num}'].value = f'=IFERROR(INDEX(Main_Data!$J:$J,SMALL(IF(Main_Data!$C:$C={emp_id_formula},ROW(Main_Data!$J:$J)),ROW()-ROW($D${chart_start+3})+1)),"")'
-        # Is_Late column (for Pie Chart)
-        ws[f'E{row_num}'].value = f'=IFERROR(INDEX(Main_Data!$K:$K,SMALL(IF(Main_Data!$C:$C={emp_id_formula},ROW(Main_Data!$K:$K)),ROW()-ROW($E${chart_start+3})+1)),"")'
+    max_chart_rows = CHART_DAYS
+
+    for day in range(1, max_chart_rows + 1):
+        row_num = chart_start + 2 + day
+        # Date, Hours, Status and Is_Late (for Pie Chart) columns
+        for col, source_col in zip(['B', 'C', 'D', 'E'], ['A', 'B', 'C', 'D']):
+            ws[f'{col}{row_num}'].value = f'=IFERROR(INDEX({CHART_DATA_SHEET}!${source_col}:${source_col},{block_start}+{day}),"")'
         
         # Set number format for date
         ws[f'B{row_num}'].number_format = 'YYYY-MM-DD'
@@ -470,8 +618,8 @@ def create_chart_data_area(ws, df):
     # Add a summary for the pie chart data
     ws[f'G{chart_start + 2}'] = "Status"
     ws[f'H{chart_start + 2}'] = "Count"
-    ws[f'G{chart_start + 2}'].font = Font(bold=True)
-    ws[f'H{chart_start + 2}'].font = Font(bold=True)
+    ws[f'G{chart_start + 2}'].font = BOLD_FONT
+    ws[f'H{chart_start + 2}'].font = BOLD_FONT
     
     ws[f'G{chart_start + 3}'] = "PRESENT"
     ws[f'H{chart_start + 3}'] = f'=COUNTIFS(D{chart_start+3}:D{chart_start+3+max_chart_rows-1},"PRESENT")'
@@ -486,7 +634,7 @@ def create_interactive_charts(ws):
     """Create charts that update based on dynamic data"""
     
     chart_start = 18 # Same as in create_chart_data_area
-    max_chart_rows = 100 # Same as in create_chart_data_area
+    max_chart_rows = CHART_DAYS # Same as in create_chart_data_area
 
     # Chart 1: Daily Working Hours Line Chart
     line_chart = LineChart()
@@ -537,53 +685,41 @@ def create_interactive_charts(ws):
     
     ws.add_chart(pie_chart, "R18")
 
-def create_employee_trends_sheet(wb, df, employees):
+def create_employee_trends_sheet(wb, df, employee_list, data_end_row, weeks):
     """Create sheet with employee trend analysis"""
     ws = wb.create_sheet("Employee_Trends")
     
     # Title
     ws['A1'] = "📈 Employee Trends Analysis"
-    ws['A1'].font = Font(bold=True, size=18, color="2C3E50")
+    ws['A1'].font = SHEET_TITLE_FONT
     ws.merge_cells('A1:H1')
-    ws['A1'].alignment = Alignment(horizontal='center')
+    ws['A1'].alignment = CENTER
     
     # Employee dropdown (same as other sheet)
     ws['A3'] = "Select Employee:"
     ws['A3'].font = Font(bold=True, size=12)
     
-    employee_list = sorted([f"{emp_id} - {name}" for emp_id, name in employees.items()])
-    
-    for i, emp in enumerate(employee_list, 1):
-        ws.cell(row=i, column=15, value=emp)
-    
-    dv = DataValidation(
-        type="list",
-        formula1=f"=$O$1:$O${len(employee_list)}", # Absolute reference
-        showDropDown=True
-    )
-    dv.add(ws['B3'])
-    ws.add_data_validation(dv)
-    ws['B3'] = employee_list[0] if employee_list else ""
+    add_employee_dropdown(ws, 'B3', employee_list)
     
     # Monthly trends
-    create_monthly_trends_section(ws)
+    create_monthly_trends_section(ws, data_end_row)
     
     # Punctuality trends
-    create_punctuality_trends_section(ws)
+    create_punctuality_trends_section(ws, weeks)
 
-def create_monthly_trends_section(ws):
+def create_monthly_trends_section(ws, data_end_row):
     """Create monthly trends analysis"""
     
     ws['A5'] = "📅 Monthly Trends"
-    ws['A5'].font = Font(bold=True, size=14, color="2C3E50")
+    ws['A5'].font = SECTION_FONT
     
     # Headers
     headers = ['Month', 'Total Days', 'Present Days', 'Late Days', 'Avg Hours', 'Punctuality %']
     for col, header in enumerate(headers, 1):
         cell = ws.cell(row=7, column=col, value=header)
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        cell.alignment = Alignment(horizontal='center')
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = CENTER
     
     # Sample monthly data (in practice, this would be calculated from actual data)
     # Generate last 6 months for example
@@ -594,6 +730,10 @@ def create_monthly_trends_section(ws):
         months.append(month)
     months.reverse() # Show most recent last
     
+    # Main_Data columns, bounded to the rows that hold records
+    ids, dates, hours, statuses, late = (
+        main_data_column(col, data_end_row) for col in ['C', 'D', 'G', 'J', 'K'])
+    
     for i, month in enumerate(months, 8):
         ws.cell(row=i, column=1, value=month)
         
@@ -604,25 +744,25 @@ def create_monthly_trends_section(ws):
         end_date_ref = f'EDATE({start_date_ref},1)' # Start of next month
         
         # Total days in month (records for selected employee within this month)
-        ws.cell(row=i, column=2, value=f'=COUNTIFS(Main_Data!C:C,{emp_id_formula},Main_Data!D:D,">="&{start_date_ref},Main_Data!D:D,"<"&{end_date_ref})')
+        ws.cell(row=i, column=2, value=f'=COUNTIFS({ids},{emp_id_formula},{dates},">="&{start_date_ref},{dates},"<"&{end_date_ref})')
         
         # Present days
-        ws.cell(row=i, column=3, value=f'=COUNTIFS(Main_Data!C:C,{emp_id_formula},Main_Data!D:D,">="&{start_date_ref},Main_Data!D:D,"<"&{end_date_ref},Main_Data!J:J,"PRESENT")')
+        ws.cell(row=i, column=3, value=f'=COUNTIFS({ids},{emp_id_formula},{dates},">="&{start_date_ref},{dates},"<"&{end_date_ref},{statuses},"PRESENT")')
         
         # Late days
-        ws.cell(row=i, column=4, value=f'=COUNTIFS(Main_Data!C:C,{emp_id_formula},Main_Data!D:D,">="&{start_date_ref},Main_Data!D:D,"<"&{end_date_ref},Main_Data!K:K,TRUE)')
+        ws.cell(row=i, column=4, value=f'=COUNTIFS({ids},{emp_id_formula},{dates},">="&{start_date_ref},{dates},"<"&{end_date_ref},{late},TRUE)')
         
         # Average hours
-        ws.cell(row=i, column=5, value=f'=ROUND(AVERAGEIFS(Main_Data!G:G,Main_Data!C:C,{emp_id_formula},Main_Data!D:D,">="&{start_date_ref},Main_Data!D:D,"<"&{end_date_ref},Main_Data!G:G,">0"),2)')
+        ws.cell(row=i, column=5, value=f'=ROUND(AVERAGEIFS({hours},{ids},{emp_id_formula},{dates},">="&{start_date_ref},{dates},"<"&{end_date_ref},{hours},">0"),2)')
         
         # Punctuality percentage
         ws.cell(row=i, column=6, value=f'=IF(C{i}>0,TEXT((C{i}-D{i})/C{i},"0.0%"),"0%")')
 
-def create_punctuality_trends_section(ws):
+def create_punctuality_trends_section(ws, weeks):
     """Create punctuality trends section"""
     
     ws['A15'] = "⏰ Punctuality Analysis"
-    ws['A15'].font = Font(bold=True, size=14, color="2C3E50")
+    ws['A15'].font = SECTION_FONT
     
     # Create weekly punctuality chart data
     ws['A17'] = "Week"
@@ -630,15 +770,15 @@ def create_punctuality_trends_section(ws):
     ws['C17'] = "Late"
     
     for col in ['A', 'B', 'C']:
-        ws[f'{col}17'].font = Font(bold=True)
-        ws[f'{col}17'].fill = PatternFill(start_color="E6E6FA", end_color="E6E6FA", fill_type="solid")
+        ws[f'{col}17'].font = BOLD_FONT
+        ws[f'{col}17'].fill = SUBHEADER_FILL
     
-    # Sample weekly data (this would be calculated dynamically)
-    weeks = ['Week 1', 'Week 2', 'Week 3', 'Week 4'] # Last 4 weeks
+    # Weekly counts for the selected employee, precomputed in the hidden chart data sheet
+    block_start = f'(MATCH($B$3,{EMPLOYEE_LIST_SHEET}!$A:$A,0)-1)*{CHART_DAYS}'
     for i, week in enumerate(weeks, 18):
-        ws[f'A{i}'] = week
-        ws[f'B{i}'] = f'=RANDBETWEEN(3,5)'  # Placeholder - replace with actual formula
-        ws[f'C{i}'] = f'=RANDBETWEEN(0,2)'  # Placeholder - replace with actual formula
+        ws[f'A{i}'] = f"Week of {week.strftime('%Y-%m-%d')}"
+        ws[f'B{i}'] = f'=IFERROR(INDEX({CHART_DATA_SHEET}!$F:$F,{block_start}+{i - 17}),0)'
+        ws[f'C{i}'] = f'=IFERROR(INDEX({CHART_DATA_SHEET}!$G:$G,{block_start}+{i - 17}),0)'
 
 
 def create_comparison_sheet(wb, df):
@@ -647,23 +787,26 @@ def create_comparison_sheet(wb, df):
     
     # Title
     ws['A1'] = "👥 Employee Performance Comparison"
-    ws['A1'].font = Font(bold=True, size=18, color="2C3E50")
+    ws['A1'].font = SHEET_TITLE_FONT
     ws.merge_cells('A1:H1')
-    ws['A1'].alignment = Alignment(horizontal='center')
+    ws['A1'].alignment = CENTER
     
     # Create summary table for all employees
-    employee_stats = df.groupby(['Employee_ID', 'Employee_Name']).agg({
+    # Present days are summed from a 0/1 column so every aggregation is a built-in
+    present = (df['Status'].to_numpy() != 'ABSENT').astype(np.int8)
+    employee_stats = df.assign(_present=present).groupby(['Employee_ID', 'Employee_Name']).agg({
         'Working_Hours': ['mean', 'sum', 'count'],
         'Is_Late': 'sum',
-        'Status': lambda x: (x != 'ABSENT').sum()
+        '_present': 'sum'
     }).round(2)
     
     employee_stats.columns = ['Avg_Hours', 'Total_Hours', 'Days_Count', 'Late_Count', 'Present_Days']
     # Ensure no division by zero for Punctuality_Rate
-    employee_stats['Punctuality_Rate'] = employee_stats.apply(
-        lambda row: round(((row['Present_Days'] - row['Late_Count']) / row['Present_Days']) * 100, 1) 
-        if row['Present_Days'] > 0 else 0.0, axis=1
-    )
+    present_days = employee_stats['Present_Days'].to_numpy()
+    on_time_days = present_days - employee_stats['Late_Count'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        punctuality = np.where(present_days > 0, on_time_days / present_days * 100, 0.0)
+    employee_stats['Punctuality_Rate'] = punctuality.round(1)
     
     employee_stats = employee_stats.reset_index()
     
@@ -672,14 +815,16 @@ def create_comparison_sheet(wb, df):
     
     for col, header in enumerate(headers, 1):
         cell = ws.cell(row=3, column=col, value=header)
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        cell.alignment = Alignment(horizontal='center')
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = CENTER
     
-    for row_idx, (_, row) in enumerate(employee_stats.iterrows(), 4):
-        for col_idx, value in enumerate(row, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            cell.alignment = Alignment(horizontal='center')
+    # One appended row per employee, in header order, from row 4
+    for values in employee_stats[headers].itertuples(index=False, name=None):
+        ws.append(values)
+    for row in ws.iter_rows(min_row=4, max_col=len(headers)):
+        for cell in row:
+            cell.alignment = CENTER
     
     # Auto-adjust columns for comparison sheet
     for col_num in range(1, len(headers) + 1):
@@ -701,28 +846,16 @@ def create_comparison_charts(ws, employee_stats):
     ws.cell(chart_row_start, 2, "Avg Hours")
     ws.cell(chart_row_start, 3, "Punctuality Rate") # For second chart
     
-    for i, (_, row) in enumerate(top_performers.iterrows(), 1):
-        ws.cell(chart_row_start + i, 1, row['Employee_Name'][:15]) # Limit name length
-        ws.cell(chart_row_start + i, 2, row['Avg_Hours'])
-        ws.cell(chart_row_start + i, 3, row['Punctuality_Rate'])
+    rows = zip(top_performers['Employee_Name'].str[:15].tolist(), # Limit name length
+               top_performers['Avg_Hours'].tolist(),
+               top_performers['Punctuality_Rate'].tolist())
+    for i, row in enumerate(rows, 1):
+        for col, value in enumerate(row, 1):
+            ws.cell(chart_row_start + i, col, value)
     
     # Chart 1: Top Performers by Average Hours Bar Chart
-    bar_chart_avg_hours = BarChart()
-    bar_chart_avg_hours.title = "Top Performers by Average Hours"
-    bar_chart_avg_hours.height = 10
-    bar_chart_avg_hours.width = 15
-    bar_chart_avg_hours.x_axis.title = "Employees"
-    bar_chart_avg_hours.y_axis.title = "Average Hours"
-    
-    data_avg_hours = Reference(ws, min_col=2, min_row=chart_row_start, 
-                     max_row=chart_row_start + len(top_performers), max_col=2)
-    categories_avg_hours = Reference(ws, min_col=1, min_row=chart_row_start + 1, 
-                                  max_row=chart_row_start + len(top_performers), max_col=1)
-    
-    bar_chart_avg_hours.add_data(data_avg_hours, titles_from_data=True) # titles_from_data=True for header
-    bar_chart_avg_hours.set_categories(categories_avg_hours)
-    
-    ws.add_chart(bar_chart_avg_hours, f"A{chart_row_start + 15}") # Position first chart
+    add_top_performers_chart(ws, "Top Performers by Average Hours", "Average Hours",
+                             1, 2, chart_row_start, len(top_performers), f"A{chart_row_start + 15}") # Position first chart
     
     # Chart 2: Top Performers by Punctuality Rate Bar Chart
     top_punctual = employee_stats.nlargest(min(10, len(employee_stats)), 'Punctuality_Rate') # Top by punctuality
@@ -733,42 +866,49 @@ def create_comparison_charts(ws, employee_stats):
     ws.cell(chart_row_punctual_start, 5, "Employee")
     ws.cell(chart_row_punctual_start, 6, "Punctuality Rate")
 
-    for i, (_, row) in enumerate(top_punctual.iterrows(), 1):
-        ws.cell(chart_row_punctual_start + i, 5, row['Employee_Name'][:15])
-        ws.cell(chart_row_punctual_start + i, 6, row['Punctuality_Rate'])
+    rows = zip(top_punctual['Employee_Name'].str[:15].tolist(),
+               top_punctual['Punctuality_Rate'].tolist())
+    for i, row in enumerate(rows, 1):
+        for col, value in enumerate(row, 5):
+            ws.cell(chart_row_punctual_start + i, col, value)
+
+    add_top_performers_chart(ws, "Top Performers by Punctuality Rate", "Punctuality Rate (%)",
+                             5, 6, chart_row_punctual_start, len(top_punctual), f"Q{chart_row_start + 15}") # Position second chart
 
-    bar_chart_punctuality = BarChart()
-    bar_chart_punctuality.title = "Top Performers by Punctuality Rate"
-    bar_chart_punctuality.height = 10
-    bar_chart_punctuality.width = 15
-    bar_chart_punctuality.x_axis.title = "Employees"
-    bar_chart_punctuality.y_axis.title = "Punctuality Rate (%)"
+def add_top_performers_chart(ws, title, y_title, name_col, value_col, header_row, count, anchor):
+    """Add a bar chart of the `count` rows below `header_row`: names in `name_col`, values in `value_col`"""
+    bar_chart = BarChart()
+    bar_chart.title = title
+    bar_chart.height = 10
+    bar_chart.width = 15
+    bar_chart.x_axis.title = "Employees"
+    bar_chart.y_axis.title = y_title
     
-    data_punctuality = Reference(ws, min_col=6, min_row=chart_row_punctual_start, 
-                                 max_row=chart_row_punctual_start + len(top_punctual), max_col=6)
-    categories_punctuality = Reference(ws, min_col=5, min_row=chart_row_punctual_start + 1, 
-                                       max_row=chart_row_punctual_start + len(top_punctual), max_col=5)
+    last_row = header_row + count
+    data = Reference(ws, min_col=value_col, min_row=header_row, max_row=last_row, max_col=value_col)
+    categories = Reference(ws, min_col=name_col, min_row=header_row + 1, max_row=last_row, max_col=name_col)
     
-    bar_chart_punctuality.add_data(data_punctuality, titles_from_data=True)
-    bar_chart_punctuality.set_categories(categories_punctuality)
+    bar_chart.add_data(data, titles_from_data=True) # titles_from_data=True for header
+    bar_chart.set_categories(categories)
     
-    ws.add_chart(bar_chart_punctuality, f"Q{chart_row_start + 15}") # Position second chart
+    ws.add_chart(bar_chart, anchor)
 
 
-def print_summary(data):
-    """Print summary to console"""
-    df = pd.DataFrame(data)
+def print_summary(summary):
+    """Print the summary counts returned by process_attendance_data to console"""
+    if summary['total_days_recorded'] == 0:
+        print("\n📊 No attendance records to summarize")
+        return
     
-    total_employees = len(df['Employee_ID'].unique())
-    present_count = len(df[df['Status'].isin(['PRESENT', 'HALF_DAY'])]) # Consider half-day as present
-    late_count = len(df[df['Is_Late'] == True])
+    total_employees = summary['total_employees']
+    present_count = summary['present_count']
+    late_count = summary['late_count']
     
     # Attendance rate based on 'Present' or 'Half_Day' records per unique employee day
-    # This calculation needs to be more precise: it's not total_employees vs present_count
     # It's unique (Employee_ID, Date) pairs where status is not ABSENT vs total unique (Employee_ID, Date) pairs.
-    total_days_recorded = len(df[['Employee_ID', 'Date']].drop_duplicates())
-    present_days_recorded = len(df[df['Status'].isin(['PRESENT', 'HALF_DAY'])][['Employee_ID', 'Date']].drop_duplicates())
-    attendance_rate = (present_days_recorded / total_days_recorded) * 100 if total_days_recorded > 0 else 0
+    total_days_recorded = summary['total_days_recorded']
+    present_days_recorded = summary['present_days_recorded']
+    attendance_rate = (present_days_recorded / total_days_recorded) * 100
     
     print("\n" + "="*60)
     print("📊 INTERACTIVE ATTENDANCE SYSTEM SUMMARY")
@@ -786,16 +926,18 @@ def process_biometric_data_for_excel_dashboard(employee_file_path, attendance_fi
     This function is designed to be called by your Flask app.
     
     Args:
-        employee_file_path (str): Path to the raw binary employee data file.
-        attendance_file_path (str): Path to the raw tab-separated attendance data file.
+        employee_file_path (str or file-like): Path to the raw binary employee data file,
+            or a binary file-like object (e.g. io.BytesIO) holding its contents.
+        attendance_file_path (str or file-like): Path to the raw tab-separated attendance
+            data file, or a binary file-like object holding its contents.
         output_excel_path (str): The desired path and filename for the output Excel dashboard.
         
     Returns:
         bool: True if the Excel dashboard was created successfully, False otherwise.
     """
     print("--- Starting Biometric Data Processing for Excel Dashboard ---")
-    print(f"Employee File: {employee_file_path}")
-    print(f"Attendance File: {attendance_file_path}")
+    print(f"Employee File: {describe_source(employee_file_path)}")
+    print(f"Attendance File: {describe_source(attendance_file_path)}")
     print(f"Output Excel: {output_excel_path}")
 
     employees = parse_binary_employee_file(employee_file_path)
@@ -803,9 +945,8 @@ def process_biometric_data_for_excel_dashboard(employee_file_path, attendance_fi
     if not employees:
         print("\n⚠️ Trying alternative parsing method for employee file...")
         try:
-            with open(employee_file_path, 'rb') as f:
-                data = f.read()
-            employees = extract_names_and_ids_from_binary(data)
+            with source_buffer(employee_file_path) as data:
+                employees = extract_names_and_ids_from_binary(data)
         except Exception as e:
             print(f"❌ Alternative method failed for employee file: {e}")
     
@@ -814,19 +955,19 @@ def process_biometric_data_for_excel_dashboard(employee_file_path, attendance_fi
         return False
     
     attendance_records = parse_attendance_file(attendance_file_path)
-    if not attendance_records:
+    if attendance_records.empty:
         print("❌ Failed to load attendance records. Cannot create report.")
         return False
     
-    processed_data = process_attendance_data(attendance_records, employees)
-    if not processed_data:
+    processed_data, summary = process_attendance_data(attendance_records, employees)
+    if processed_data.empty:
         print("❌ Failed to process attendance data. Cannot create report.")
         return False
     
     success = create_interactive_excel_report(processed_data, employees, output_excel_path)
     
     if success:
-        print_summary(processed_data) # Print summary to console for server logs
+        print_summary(summary) # Print summary to console for server logs
         print("\n--- Biometric Data Processing for Excel Dashboard Completed Successfully ---")
     else:
         print("\n--- Biometric Data Processing for Excel Dashboard FAILED ---")
@@ -835,27 +976,23 @@ def process_biometric_data_for_excel_dashboard(employee_file_path, attendance_fi
 
 # --- Keep the __main__ block for standalone testing, but it won't be used by Flask ---
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Build the interactive Excel dashboard from raw biometric files. "
+                    "This script is primarily designed to be called by the Flask backend.")
+    parser.add_argument('-e', dest='employee_file', required=True, help="raw binary employee data file")
+    parser.add_argument('-a', dest='attendance_file', required=True, help="raw tab-separated attendance file")
+    args = parser.parse_args() # Exits with the usage message before any file is read
+    
     try:
-        # Original main function logic for command line execution
-        # You would typically provide the paths as arguments like:
-        # python biometric_processor.py -e employee.dat -a attendance.txt
+        # Define a default output file name for standalone runs
+        today = datetime.date.today()
+        output_file = f"interactive_attendance_charts_{today.strftime('%Y%m%d')}_standalone.xlsx"
         
-        if len(sys.argv) >= 5 and sys.argv[1] == '-e' and sys.argv[3] == '-a':
-            employee_file = sys.argv[2]
-            attendance_file = sys.argv[4]
-            # Define a default output file name for standalone runs
-            today = datetime.date.today()
-            output_file = f"interactive_attendance_charts_{today.strftime('%Y%m%d')}_standalone.xlsx"
-            
-            process_biometric_data_for_excel_dashboard(employee_file, attendance_file, output_file)
-            print(f"Standalone report saved to: {output_file}")
-        else:
-            print("❌ Usage for standalone run: python biometric_processor.py -e <employee_file> -a <attendance_file>")
-            print("This script is primarily designed to be called by the Flask backend.")
+        process_biometric_data_for_excel_dashboard(args.employee_file, args.attendance_file, output_file)
+        print(f"Standalone report saved to: {output_file}")
 
     except KeyboardInterrupt:
         print("\n👋 Process interrupted")
     except Exception as e:
         print(f"\n💥 Error: {e}")
         traceback.print_exc()
-
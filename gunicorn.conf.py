@@ -0,0 +1,25 @@
+"""Gunicorn settings, read automatically when gunicorn starts from this directory.
+
+Each value can be overridden with an environment variable on the host, e.g.
+GUNICORN_WORKER_CLASS=gevent (after `pip install gevent`) to serve many slow
+clients per worker instead of a fixed number of threads.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '10000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+
+# gthread: each worker answers up to `threads` requests at once. The API is
+# served from in-memory data, so requests are short and mostly I/O.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+# Only used by the async workers (gevent/eventlet): open connections per worker
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
+
+# Uploads parse and write a whole workbook before they respond
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+
+# Load the app (and the latest dashboard) once in the master so workers are
+# forked with the data already in shared memory. gevent has to monkey-patch
+# the standard library before the app is imported, so it loads per worker.
+preload_app = worker_class != "gevent"
@@ -0,0 +1,205 @@
+"""Upload round trips and the background job files behind /api/job/<job_id>.
+
+Run from the repository root: python -m unittest discover tests
+"""
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+
+import app
+
+SAMPLE_DASHBOARD = os.path.join(app.UPLOAD_FOLDER, 'interactive_attendance_charts_20250723_123349.xlsx')
+
+
+def fake_processor(succeed=True):
+    """Stand-in for biometric_processor that writes a known dashboard to the output path."""
+    def process(employee_buffer, attendance_buffer, output_excel_path):
+        if succeed:
+            shutil.copyfile(SAMPLE_DASHBOARD, output_excel_path)
+        return succeed
+    module = types.ModuleType('biometric_processor')
+    module.process_biometric_data_for_excel_dashboard = process
+    return module
+
+
+def upload_form():
+    return {
+        'employee_file': (io.BytesIO(b'employee'), 'employees.bin'),
+        'attendance_file': (io.BytesIO(b'attendance'), 'attendance.dat'),
+    }
+
+
+def dead_pid():
+    """Pid of a process that has already exited."""
+    proc = subprocess.Popen([sys.executable, '-c', 'pass'])
+    proc.wait()
+    return proc.pid
+
+
+class UploadJobTestCase(unittest.TestCase):
+    def setUp(self):
+        upload_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, upload_folder)
+        self.jobs_folder = os.path.join(upload_folder, 'jobs')
+        os.makedirs(self.jobs_folder)
+        for patcher in (
+            mock.patch.dict(app.app.config, UPLOAD_FOLDER=upload_folder),
+            mock.patch.object(app, 'JOBS_FOLDER', self.jobs_folder),
+            mock.patch.object(app, 'UPLOAD_LOCK_PATH', os.path.join(upload_folder, '.upload.lock')),
+            mock.patch.dict(sys.modules, biometric_processor=fake_processor()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(app.load_bio_store.cache_clear)
+        self.client = app.app.test_client()
+
+    def write_job_file(self, name, body, age=None):
+        path = os.path.join(self.jobs_folder, name)
+        with open(path, 'wb') as f:
+            f.write(body)
+        if age is not None:
+            mtime = time.time() - age
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def wait_for_job(self, status_url, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.client.get(status_url).get_json()
+            if job['status'] not in ('queued', 'running'):
+                return job
+            time.sleep(0.05)
+        self.fail(f"{status_url} did not finish within {timeout}s")
+
+
+class UploadRoundTripTests(UploadJobTestCase):
+    def test_sync_upload_serves_new_dashboard(self):
+        response = self.client.post('/api/upload', data=upload_form())
+        self.assertEqual(response.status_code, 200)
+        dashboard_file = response.get_json()['dashboard_file']
+        self.assertEqual(os.path.basename(app.get_latest_processed_excel_path()), dashboard_file)
+        with self.client.get('/api/download-latest-dashboard') as download:
+            self.assertEqual(download.status_code, 200)
+        self.assertTrue(self.client.get('/api/employees').get_json()['employees'])
+
+    def test_async_upload_reports_done(self):
+        response = self.client.post('/api/upload', data=upload_form(), headers={'Prefer': 'respond-async'})
+        self.assertEqual(response.status_code, 202)
+        status_url = response.get_json()['status_url']
+        self.assertEqual(response.headers['Location'], status_url)
+
+        job = self.wait_for_job(status_url)
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['pid'], os.getpid())
+        self.assertLessEqual(job['started_at'], job['finished_at'])
+        self.assertEqual(os.path.basename(app.get_latest_processed_excel_path()), job['dashboard_file'])
+
+    def test_async_upload_reports_failure(self):
+        with mock.patch.dict(sys.modules, biometric_processor=fake_processor(succeed=False)):
+            response = self.client.post('/api/upload', data=upload_form(), headers={'Prefer': 'respond-async'})
+            job = self.wait_for_job(response.get_json()['status_url'])
+        self.assertEqual(job['status'], 'failed')
+        self.assertIn('error', job)
+        self.assertIsNone(app.get_latest_processed_excel_path())
+
+    def test_unknown_job(self):
+        self.assertEqual(self.client.get('/api/job/doesnotexist').status_code, 404)
+        self.assertEqual(self.client.get('/api/job/not-a-job').status_code, 404)
+
+
+class JobExpiryTests(UploadJobTestCase):
+    def test_old_finished_jobs_and_tmp_files_are_removed(self):
+        old = app.JOB_STATUS_TTL + 60
+        self.write_job_file('done1.json', orjson.dumps({'job_id': 'done1', 'status': 'done'}), age=old)
+        self.write_job_file('failed1.json', orjson.dumps({'job_id': 'failed1', 'status': 'failed'}), age=old)
+        self.write_job_file('done1.json.123.tmp', b'{"job_id": "do', age=old)
+        self.write_job_file('recent1.json', orjson.dumps({'job_id': 'recent1', 'status': 'done'}))
+        # Still owned by this (live) process, however old the file is
+        app.write_job_status('running1', 'running')
+        os.utime(app.get_job_status_path('running1'), (time.time() - old,) * 2)
+
+        app.remove_expired_jobs()
+
+        self.assertEqual(sorted(os.listdir(self.jobs_folder)), ['recent1.json', 'running1.json'])
+
+    def test_old_abandoned_job_is_removed(self):
+        body = orjson.dumps({'job_id': 'gone1', 'status': 'running', 'pid': dead_pid()})
+        self.write_job_file('gone1.json', body, age=app.JOB_STATUS_TTL + 60)
+        app.remove_expired_jobs()
+        self.assertEqual(os.listdir(self.jobs_folder), [])
+
+
+class BrokenJobFileTests(UploadJobTestCase):
+    def test_corrupt_job_file_is_reported_failed(self):
+        for job_id, body in [('bad1', b'{"job_id": "ba'), ('bad2', b'{"job_id": "bad2"}'), ('bad3', b'[1]')]:
+            self.write_job_file(f'{job_id}.json', body)
+            response = self.client.get(f'/api/job/{job_id}')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()['status'], 'failed')
+
+    def test_old_corrupt_job_file_does_not_block_uploads(self):
+        self.write_job_file('bad1.json', b'{"job_id": "ba', age=app.JOB_STATUS_TTL + 60)
+        self.write_job_file('bad2.json', b'{"job_id": "bad2"}', age=app.JOB_STATUS_TTL + 60)
+
+        response = self.client.post('/api/upload', data=upload_form(), headers={'Prefer': 'respond-async'})
+
+        self.assertEqual(response.status_code, 202)
+        self.wait_for_job(response.get_json()['status_url'])
+        self.assertEqual(os.listdir(self.jobs_folder), [f"{response.get_json()['job_id']}.json"])
+
+    def test_job_of_exited_worker_is_reported_failed(self):
+        pid = dead_pid()
+        self.write_job_file('gone1.json', orjson.dumps({'job_id': 'gone1', 'status': 'running', 'pid': pid}))
+
+        job = self.client.get('/api/job/gone1').get_json()
+
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['pid'], pid)
+        with open(app.get_job_status_path('gone1'), 'rb') as f:
+            self.assertEqual(orjson.loads(f.read())['status'], 'failed')
+
+    @unittest.skipUnless(os.path.isdir('/proc'), "needs /proc for process start times")
+    def test_job_of_recycled_pid_is_reported_failed(self):
+        # This process's pid, but not the process that wrote the file
+        start_time = app.get_process_start_time(os.getpid())
+        body = orjson.dumps({'job_id': 'reused1', 'status': 'running',
+                             'pid': os.getpid(), 'pid_start_time': start_time - 1})
+        self.write_job_file('reused1.json', body)
+
+        self.assertEqual(self.client.get('/api/job/reused1').get_json()['status'], 'failed')
+
+    def test_job_of_live_worker_stays_running(self):
+        app.write_job_status('live1', 'running', started_at=time.time())
+        self.assertEqual(self.client.get('/api/job/live1').get_json()['status'], 'running')
+
+
+@unittest.skipIf(app.fcntl is None, "flock() is only available where fcntl is")
+class UploadLockTests(UploadJobTestCase):
+    def test_lock_blocks_other_processes(self):
+        try_lock = (
+            "import fcntl, sys\n"
+            "with open(sys.argv[1], 'a') as f:\n"
+            "    try:\n"
+            "        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)\n"
+            "    except BlockingIOError:\n"
+            "        sys.exit(1)\n"
+        )
+        command = [sys.executable, '-c', try_lock, app.UPLOAD_LOCK_PATH]
+        with app.upload_lock():
+            self.assertEqual(subprocess.run(command).returncode, 1)
+        self.assertEqual(subprocess.run(command).returncode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()